@@ -2,6 +2,7 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import joblib
 import os
+from utils.compact_model import load_compact_model
 
 # New imports for OPENAI assistant
 from dotenv import load_dotenv
@@ -32,13 +33,17 @@ if needed, ask users to use made-up examples instead.
 # Load model + vectorizer
 MODEL_PATH = "models/phishing_model.pkl"
 VECTORIZER_PATH = "models/vectorizer.pkl"
-
-if not os.path.exists(MODEL_PATH) or not os.path.exists(VECTORIZER_PATH):
+COMPACT_MODEL_PATH = "models/phishing_model.smodel"
+
+if os.path.exists(COMPACT_MODEL_PATH):
+    # pickle-free, memory-mapped export of the same model
+    model, vectorizer = load_compact_model(COMPACT_MODEL_PATH).to_sklearn()
+elif os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH):
+    model = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+else:
     raise FileNotFoundError("❌ Model or vectorizer not found. Please run train_model.py first.")
 
-model = joblib.load(MODEL_PATH)
-vectorizer = joblib.load(VECTORIZER_PATH)
-
 @app.route("/")
 def home():
     return jsonify({"message": "Phishing Detection Backend is running!"})
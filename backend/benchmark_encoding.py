@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+benchmarks JSON serialization and compression of an analyze response
+
+builds the full (non-slim) /instagram/analyze response for a synthetic
+profile - 50 posts with comments by default, some carrying PII - through the
+real AnalysisPipeline, then times Flask's stdlib JSON provider against the
+orjson one and compares gzip with brotli at the server's default settings.
+no Apify token or network access is needed
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# adds parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from src.smea.analysis_pipeline import AnalysisPipeline, AnalysisRequest, PlatformAdapter
+from src.smea.response_encoding import (
+    DEFAULT_BROTLI_QUALITY, DEFAULT_GZIP_LEVEL, brotli, compress, make_orjson_provider_class, orjson
+)
+
+WORDS = ("summer trip beach friends family coffee love sunset weekend city work new post "
+         "happy birthday dinner concert hiking morning").split()
+
+
+class FixtureService:
+    """stands in for InstagramService: same user_data shape, generated instead of scraped"""
+
+    def __init__(self, posts, comments, seed=7):
+        self.posts = posts
+        self.comments = comments
+        self.seed = seed
+
+    def get_user_data(self, username, profile, budget_secs=None):
+        rng = random.Random(self.seed)
+        media = []
+        for i in range(self.posts):
+            caption = " ".join(rng.choice(WORDS) for _ in range(40))
+            if i % 7 == 0:
+                caption += f" call me 555-201-{i:04d} or write {username}{i}@gmail.com"
+            media.append({
+                "id": f"3{i:018d}",
+                "type": "Image",
+                "caption": caption,
+                "timestamp": "2024-05-01T12:00:00.000Z",
+                "permalink": f"https://www.instagram.com/p/C{i:09d}/",
+                "url": f"https://scontent.cdninstagram.com/v/t51.29350-15/{'x' * 180}{i}.jpg",
+                "thumbnailUrl": f"https://scontent.cdninstagram.com/v/t51.29350-15/{'x' * 180}{i}.jpg",
+                "likesCount": 100 + i,
+                "commentsCount": self.comments,
+                "comments": [
+                    {
+                        "id": f"{i}-{j}",
+                        "text": " ".join(rng.choice(WORDS) for _ in range(12)),
+                        "author": f"user{j}",
+                        "timestamp": "2024-05-01T13:00:00.000Z",
+                        "likesCount": j
+                    }
+                    for j in range(self.comments)
+                ]
+            })
+        return {
+            "platform": "instagram",
+            "user": {
+                "id": username,
+                "username": username,
+                "accountType": "personal",
+                "mediaCount": self.posts,
+                "followersCount": 1234,
+                "followingCount": 321,
+                "name": "Jane Doe",
+                "profilePictureUrl": "https://scontent.cdninstagram.com/pic.jpg"
+            },
+            "media": {"data": media, "count": len(media)},
+            "biography": f"Living in Austin TX, {username}@gmail.com",
+            "scrapeProfile": profile,
+            "coverage": {"partial": False, "itemsReturned": len(media)},
+            "fetchedAt": 1714564800.0
+        }
+
+    def extract_text_content(self, user_data):
+        posts = user_data["media"]["data"]
+        return {
+            "bio": user_data["biography"],
+            "posts": [post["caption"] for post in posts if post["caption"].strip()],
+            "comments": [comment["text"] for post in posts for comment in post["comments"]]
+        }
+
+
+def build_response(posts, comments):
+    pipeline = AnalysisPipeline([
+        PlatformAdapter("instagram", "username", "Username", lambda: FixtureService(posts, comments))
+    ])
+    return pipeline.run(AnalysisRequest("instagram", "janedoe", "deep"))
+
+
+def time_ms(func, repeat):
+    """median wall time of one call, in milliseconds"""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def serialize_with(app, response):
+    """jsonify's work: the provider's response() renders the body bytes"""
+    with app.app_context():
+        return app.json.response(response).get_data()
+
+
+def run_benchmark(posts=50, comments=5, repeat=200):
+    response = build_response(posts, comments)
+    print(f"📦 Analyze response: {posts} posts x {comments} comments, "
+          f"{response['totalFindings']} findings")
+
+    stdlib_app = Flask("stdlib")
+    encoders = [("stdlib json", stdlib_app)]
+    if orjson is not None:
+        orjson_app = Flask("orjson")
+        orjson_app.json = make_orjson_provider_class()(orjson_app)
+        encoders.append(("orjson", orjson_app))
+    else:
+        print("⚠️ orjson is not installed - only the stdlib provider is measured")
+
+    print("\n⏱️ Serialization (median per response):")
+    timings = {}
+    body = None
+    for name, app in encoders:
+        body = serialize_with(app, response)
+        timings[name] = time_ms(lambda: serialize_with(app, response), repeat)
+        print(f"   {name:<12} {timings[name]:>7.2f} ms   {len(body) / 1024:>7.1f} KB")
+    if "orjson" in timings:
+        print(f"   orjson is {timings['stdlib json'] / timings['orjson']:.1f}x faster")
+
+    print("\n🗜️ Compression of the body:")
+    codecs = [("gzip", f"level {DEFAULT_GZIP_LEVEL}")]
+    if brotli is not None:
+        codecs.append(("br", f"quality {DEFAULT_BROTLI_QUALITY}"))
+    else:
+        print("⚠️ brotli is not installed - only gzip is measured")
+    for encoding, setting in codecs:
+        compressed = compress(body, encoding)
+        elapsed = time_ms(lambda: compress(body, encoding), repeat)
+        print(f"   {encoding:<4} {setting:<10} {len(compressed) / 1024:>7.1f} KB "
+              f"({len(compressed) / len(body):.0%})  {elapsed:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark JSON encoders and compression on an analyze response"
+    )
+    parser.add_argument("--posts", type=int, default=50, help="posts in the synthetic profile")
+    parser.add_argument("--comments", type=int, default=5, help="comments per post")
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    run_benchmark(args.posts, args.comments, args.repeat)
@@ -0,0 +1,204 @@
+import os
+import io
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import joblib
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.metrics import accuracy_score
+from train_model import DATA_PATHS, load_and_combine, build_vectorizer, parse_data_paths
+from utils.compact_model import export_compact_model
+from utils.fast_inference import load_numpy_estimators
+from utils.model_registry import publish_model
+
+# vectorizer configurations - each is fitted once and its feature matrix is shared by every model
+VECTORIZER_CONFIGS = {
+    "tfidf-5k": lambda: build_vectorizer("tfidf"),
+    "tfidf-20k": lambda: TfidfVectorizer(sublinear_tf=True, stop_words="english", max_features=20000),
+    "hashing-2^18": lambda: build_vectorizer("hashing")
+}
+
+MODEL_CONFIGS = {
+    "nb": lambda: MultinomialNB(),
+    "nb-alpha0.1": lambda: MultinomialNB(alpha=0.1),
+    "logreg": lambda: LogisticRegression(max_iter=1000)
+}
+
+# what the serving path handles: the compact/numpy format, explanations and online
+# feedback all need naive bayes log probabilities and counts - the rest is benchmark only
+SERVABLE_MODELS = {"nb", "nb-alpha0.1"}
+
+# accuracy differences smaller than this are treated as ties and broken by serving cost
+ACCURACY_TOLERANCE = 0.002
+LATENCY_SAMPLE_SIZE = 1000
+
+
+def featurize(vec_name, X_train, X_test):
+    """fits one vectorizer config and returns its cached train/test matrices"""
+    vectorizer = VECTORIZER_CONFIGS[vec_name]()
+    started = time.time()
+    train_features = vectorizer.fit_transform(X_train)
+    test_features = vectorizer.transform(X_test)
+    return vec_name, vectorizer, train_features, test_features, time.time() - started
+
+
+def fit_candidate(vec_name, model_name, train_features, y_train, test_features, y_test):
+    """fits one model on a cached feature matrix and scores it"""
+    model = MODEL_CONFIGS[model_name]()
+    started = time.time()
+    model.fit(train_features, y_train)
+    fit_secs = time.time() - started
+    accuracy = accuracy_score(y_test, model.predict(test_features))
+    return vec_name, model_name, model, accuracy, fit_secs
+
+
+def measure_latency_ms(model, vectorizer, emails, repeats=3):
+    """end-to-end transform + predict_proba time per 1k raw emails (best of a few runs)"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform(emails))
+        best = min(best, time.perf_counter() - started)
+    return best * 1000 * 1000 / len(emails)
+
+
+def measure_serving_latency_ms(model, vectorizer, emails, repeats=3):
+    """the same timing on the compact/numpy path that serves requests (PHISHING_SERVE_MODE=numpy)"""
+    export_dir = tempfile.mkdtemp(prefix="select-model-")
+    try:
+        path = export_compact_model(model, vectorizer, os.path.join(export_dir, "candidate.smodel"))
+        np_model, np_vectorizer = load_numpy_estimators(path)
+        return measure_latency_ms(np_model, np_vectorizer, emails, repeats)
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+
+def artifact_size_bytes(model, vectorizer):
+    """size of the pickled model + vectorizer as they'd be saved to /models/"""
+    buffer = io.BytesIO()
+    joblib.dump((model, vectorizer), buffer)
+    return buffer.tell()
+
+
+def select_best(results, latency_budget_ms=None, max_size_mb=None):
+    """picks the most accurate servable candidate within budget, breaking near-ties by serving cost"""
+    eligible = [
+        r for r in results
+        if r["servable"]
+        and (latency_budget_ms is None or r["latencyMsPer1k"] <= latency_budget_ms)
+        and (max_size_mb is None or r["artifactBytes"] <= max_size_mb * 1024 * 1024)
+    ]
+    if not eligible:
+        return None
+
+    top_accuracy = max(r["accuracy"] for r in eligible)
+    contenders = [r for r in eligible if r["accuracy"] >= top_accuracy - ACCURACY_TOLERANCE]
+    return min(contenders, key=lambda r: (r["latencyMsPer1k"], r["artifactBytes"], -r["accuracy"]))
+
+
+def run_selection(paths=None, n_jobs=-1, latency_budget_ms=None, max_size_mb=None, export=False):
+    df = load_and_combine(paths or DATA_PATHS)
+    X = df["text"]
+    y = df["label"].astype(int)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # one feature matrix per vectorizer config, built in parallel
+    featurized = Parallel(n_jobs=n_jobs)(
+        delayed(featurize)(vec_name, X_train, X_test) for vec_name in VECTORIZER_CONFIGS
+    )
+    features = {vec_name: (vectorizer, train_f, test_f) for vec_name, vectorizer, train_f, test_f, _ in featurized}
+    for vec_name, _, train_f, _, secs in featurized:
+        print(f"🔧 {vec_name}: {train_f.shape[1]} features in {secs:.1f}s")
+
+    # every model config on every cached matrix, in parallel across cores
+    fitted = Parallel(n_jobs=n_jobs)(
+        delayed(fit_candidate)(vec_name, model_name, features[vec_name][1], y_train, features[vec_name][2], y_test)
+        for vec_name in VECTORIZER_CONFIGS
+        for model_name in MODEL_CONFIGS
+    )
+
+    # latency is timed sequentially so parallel fits don't skew it
+    sample = X_test.iloc[:LATENCY_SAMPLE_SIZE].tolist()
+    results = []
+    candidates = {}
+    for vec_name, model_name, model, accuracy, fit_secs in fitted:
+        vectorizer = features[vec_name][0]
+        name = f"{vec_name}/{model_name}"
+        candidates[name] = (model, vectorizer)
+        # servable candidates are timed the way they'll be served, the rest through sklearn
+        servable = model_name in SERVABLE_MODELS
+        measure = measure_serving_latency_ms if servable else measure_latency_ms
+        results.append({
+            "name": name,
+            "vectorizer": vec_name,
+            "model": model_name,
+            "servable": servable,
+            "accuracy": float(accuracy),
+            "fitSecs": round(fit_secs, 2),
+            "latencyMsPer1k": round(measure(model, vectorizer, sample), 2),
+            "artifactBytes": artifact_size_bytes(model, vectorizer)
+        })
+
+    results.sort(key=lambda r: -r["accuracy"])
+    print("\n📊 Candidates:")
+    for r in results:
+        print(f"   {r['name']:<28} acc={r['accuracy']:.4f}  {r['latencyMsPer1k']:>8.1f} ms/1k  "
+              f"{r['artifactBytes'] / 1024:>8.0f} KB{'' if r['servable'] else '  (not servable)'}")
+
+    best = select_best(results, latency_budget_ms, max_size_mb)
+    if best is None:
+        print("\n❌ No servable candidate fits the latency/size budget")
+    else:
+        print(f"\n🏆 Selected {best['name']} (acc={best['accuracy']:.4f}, {best['latencyMsPer1k']} ms/1k)")
+
+    os.makedirs("models", exist_ok=True)
+    with open("models/selection_report.json", "w") as f:
+        json.dump({
+            "latencyBudgetMsPer1k": latency_budget_ms,
+            "maxSizeMB": max_size_mb,
+            "selected": best["name"] if best else None,
+            "candidates": results
+        }, f, indent=2)
+    print("💾 Report saved to /models/selection_report.json")
+
+    if export and best is not None:
+        model, vectorizer = candidates[best["name"]]
+        # through the registry, so running servers hot-swap to it and online feedback builds on it
+        version = publish_model("models", model, vectorizer, metadata={
+            "featureMode": "hashing" if hasattr(vectorizer, "steps") else "tfidf",
+            "trainingMode": "selection",
+            "candidate": best["name"],
+            "testAccuracy": best["accuracy"],
+            "latencyMsPer1k": best["latencyMsPer1k"]
+        })
+        print(f"🚀 Published {best['name']} as phishing model {version} in /models/registry/")
+
+    return best, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and compare phishing model candidates in parallel")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="max end-to-end inference time per 1k emails")
+    parser.add_argument("--max-size-mb", type=float, default=None,
+                        help="max pickled artifact size")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel workers (-1 = all cores)")
+    parser.add_argument("--export", action="store_true",
+                        help="publish the selected model as a new version in /models/registry/")
+    parser.add_argument("--data", nargs="+", metavar="[NAME=]PATH",
+                        help="training CSVs (paths or globs), replaces DATA_PATHS")
+    args = parser.parse_args()
+
+    run_selection(
+        parse_data_paths(args.data) if args.data else None,
+        n_jobs=args.jobs,
+        latency_budget_ms=args.latency_budget_ms,
+        max_size_mb=args.max_size_mb,
+        export=args.export
+    )
@@ -6,9 +6,19 @@ Checks dependencies and starts the server
 
 import os
 import sys
+import argparse
 import subprocess
+import tempfile
 from pathlib import Path
 
+# production server defaults, overridable by flags or environment
+DEFAULT_BIND = os.getenv("BACKEND_BIND", "0.0.0.0:5000")
+DEFAULT_WORKERS = int(os.getenv("BACKEND_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_THREADS = int(os.getenv("BACKEND_THREADS", "8"))
+DEFAULT_KEEP_ALIVE = int(os.getenv("BACKEND_KEEP_ALIVE", "5"))
+# longer than the deep scrape profile's actor timeout
+DEFAULT_TIMEOUT = int(os.getenv("BACKEND_TIMEOUT", "330"))
+
 def check_python_version():
     """checks if Python version is 3.8+"""
     if sys.version_info < (3, 8):
@@ -73,8 +83,9 @@ def check_model_files():
     backend_dir = Path(__file__).parent
     model_path = backend_dir / "models" / "phishing_model.pkl"
     vectorizer_path = backend_dir / "models" / "vectorizer.pkl"
+    compact_path = backend_dir / "models" / "phishing_model.smodel"
     
-    if not model_path.exists() or not vectorizer_path.exists():
+    if not compact_path.exists() and (not model_path.exists() or not vectorizer_path.exists()):
         print("⚠️  Phishing detection model files not found")
         print("   Phishing detection will be unavailable")
         print("   Run 'python train_model.py' to train the model")
@@ -105,7 +116,92 @@ def start_server():
     
     return True
 
+def run_gunicorn(bind, workers, threads, keep_alive, timeout):
+    """prefork server: models load once in the master and are shared copy-on-write"""
+    import gc
+    from gunicorn.app.base import BaseApplication
+
+    # unified_app skips its background threads - each worker starts its own after fork
+    os.environ["BACKEND_PRELOAD"] = "1"
+    # each worker keeps its own metrics; they're added up through this directory
+    os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "smea-metrics"))
+    import unified_app
+    from src.smea.metrics import set_multiprocess_dir, write_snapshot
+
+    # snapshots of the previous run would be added to this one's
+    set_multiprocess_dir(os.environ["METRICS_MULTIPROC_DIR"], clear=True)
+    # what the preload counted, once - the workers start from zero
+    write_snapshot()
+
+    # keeps the garbage collector from touching (and so copying) preloaded pages
+    gc.freeze()
+
+    class UnifiedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", bind)
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread" if threads > 1 else "sync")
+            self.cfg.set("keepalive", keep_alive)
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("preload_app", True)
+            self.cfg.set("post_fork", lambda server, worker: unified_app.start_background_workers())
+
+        def load(self):
+            return unified_app.app
+
+    print(f"🚀 gunicorn on {bind}: {workers} workers x {threads} threads, keep-alive {keep_alive}s")
+    UnifiedApplication().run()
+
+def run_waitress(bind, threads, keep_alive):
+    """single-process threaded server for platforms without fork (Windows)"""
+    from waitress import serve
+    import unified_app
+
+    print(f"🚀 waitress on {bind}: {threads} threads, keep-alive {keep_alive}s (no fork on this platform)")
+    serve(unified_app.app, listen=bind, threads=threads, channel_timeout=keep_alive)
+
+def start_production_server(args):
+    """starts the multi-worker server instead of the Flask dev server"""
+    backend_dir = Path(__file__).parent
+    os.chdir(backend_dir)
+    sys.path.insert(0, str(backend_dir))
+
+    print("\n" + "=" * 70)
+    print("🚀 Starting Unified Security Tools Backend (production)...")
+    print("=" * 70 + "\n")
+
+    try:
+        if hasattr(os, "fork"):
+            run_gunicorn(args.bind, args.workers, args.threads, args.keep_alive, args.timeout)
+        else:
+            run_waitress(args.bind, args.threads, args.keep_alive)
+    except ImportError as e:
+        print(f"❌ Production server not installed ({e.name})")
+        print("   Run: pip install -r requirements.txt")
+        return False
+    except KeyboardInterrupt:
+        print("\n\n⏹  Server stopped by user")
+
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check dependencies and start the unified backend")
+    parser.add_argument("--production", action="store_true",
+                        help="multi-worker server with preloaded models instead of the Flask dev server")
+    parser.add_argument("--bind", default=DEFAULT_BIND, help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="worker processes (ignored without fork, e.g. on Windows)")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="threads per worker")
+    parser.add_argument("--keep-alive", type=int, default=DEFAULT_KEEP_ALIVE,
+                        help="seconds to hold idle keep-alive connections")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT,
+                        help="seconds before a silent worker is restarted")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
     print("\n" + "=" * 70)
     print("  UNIFIED SECURITY TOOLS BACKEND - STARTUP CHECK")
     print("=" * 70 + "\n")
@@ -129,7 +225,10 @@ def main():
     print("\n" + "=" * 70)
     
     # starts the server
-    start_server()
+    if args.production:
+        start_production_server(args)
+    else:
+        start_server()
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,20 @@
 import os
+import sys
+import glob
+import time
+import hashlib
+import argparse
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import accuracy_score
 import joblib
+from utils.compact_model import export_compact_model
+from utils.model_registry import publish_model
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -13,8 +22,91 @@ DATA_PATHS = {
     "Enron": os.path.join(BASE_DIR, "data", "Enron.csv")
 }
 
+# preprocessed sources are cached here, keyed by the raw file's hash
+CACHE_DIR = os.path.join(BASE_DIR, "data", ".cache")
+# bump when prepare_frame/clean_texts change so stale caches are ignored
+PREPROCESS_VERSION = 1
 
-def load_and_combine(paths):
+# "tfidf" fits a vocabulary, "hashing" is stateless (no vocabulary to store or look up)
+FEATURE_MODES = ("tfidf", "hashing")
+HASHING_N_FEATURES = 2 ** 18
+
+
+TEXT_COLUMNS = ["text_combined", "text", "body", "content", "Message"]
+
+
+def find_text_column(columns):
+    """detects which column holds the email text"""
+    for candidate in TEXT_COLUMNS:
+        if candidate in columns:
+            return candidate
+    return None
+
+
+def prepare_frame(df, text_col, name, clean=False):
+    """keeps text + label, drops missing/empty text and lowercases (or fully cleans)"""
+    # Keep only text + label
+    df_subset = df[[text_col]].copy()
+    if "label" in df.columns:
+        df_subset["label"] = df["label"]
+    else:
+        df_subset["label"] = 1  # Assume all phishing if unlabeled
+
+    df_subset.rename(columns={text_col: "text"}, inplace=True)
+    df_subset["source"] = name
+
+    # Drop missing/empty text
+    df_subset = df_subset.dropna(subset=["text"])
+    df_subset["text"] = df_subset["text"].astype(str).str.lower().str.strip()
+    if clean:
+        from utils.text_cleaner import clean_texts
+        df_subset["text"] = clean_texts(df_subset["text"], n_jobs=-1)
+    return df_subset[df_subset["text"].str.len() > 0]
+
+
+def file_hash(path):
+    """sha256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_source(name, path, clean=False, use_cache=True):
+    """loads and preprocesses one CSV, reusing the cached result when the file is unchanged"""
+    cache_path = None
+    if use_cache:
+        key = f"{file_hash(path)[:16]}-v{PREPROCESS_VERSION}{'-clean' if clean else ''}"
+        cache_path = os.path.join(CACHE_DIR, f"{name}-{key}.feather")
+        if os.path.exists(cache_path):
+            try:
+                df_subset = pd.read_feather(cache_path)
+                print(f"✅ Loaded {name} from cache: {df_subset.shape}")
+                return df_subset
+            except ImportError:
+                cache_path = None  # pyarrow missing - caching is optional
+
+    df = pd.read_csv(path)
+    print(f"✅ Loaded {name}: {df.shape}, Columns: {list(df.columns)}")
+
+    text_col = find_text_column(df.columns)
+    if text_col is None:
+        print(f"⚠️ No text column found in {name}, skipping")
+        return None
+
+    df_subset = prepare_frame(df, text_col, name, clean).reset_index(drop=True)
+
+    if cache_path:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df_subset.to_feather(cache_path)
+        except ImportError:
+            print("⚠️ pyarrow not installed, preprocessed data won't be cached")
+    return df_subset
+
+
+def load_and_combine(paths, clean=False, use_cache=True):
     combined_data = []
 
     for name, path in paths.items():
@@ -22,59 +114,100 @@ def load_and_combine(paths):
             print(f"⚠️ File not found: {path}")
             continue
 
-        df = pd.read_csv(path)
-        print(f"✅ Loaded {name}: {df.shape}, Columns: {list(df.columns)}")
-
-        # Detect text column
-        text_col = None
-        for candidate in ["text_combined", "text", "body", "content", "Message"]:
-            if candidate in df.columns:
-                text_col = candidate
-                break
-
-        if text_col is None:
-            print(f"⚠️ No text column found in {name}, skipping")
-            continue
-
-        # Keep only text + label
-        df_subset = df[[text_col]].copy()
-        if "label" in df.columns:
-            df_subset["label"] = df["label"]
-        else:
-            df_subset["label"] = 1  # Assume all phishing if unlabeled
-
-        df_subset.rename(columns={text_col: "text"}, inplace=True)
-        df_subset["source"] = name
-        combined_data.append(df_subset)
+        df_subset = load_source(name, path, clean, use_cache)
+        if df_subset is not None:
+            combined_data.append(df_subset)
 
     if not combined_data:
         raise ValueError("❌ No valid datasets loaded!")
 
     combined_df = pd.concat(combined_data, ignore_index=True)
 
-    # Drop missing/empty text
-    combined_df = combined_df.dropna(subset=["text"])
-    combined_df["text"] = combined_df["text"].astype(str).str.lower().str.strip()
-    combined_df = combined_df[combined_df["text"].str.len() > 0]
-
     print(f"📊 Combined dataset size: {combined_df.shape}")
     print(combined_df["label"].value_counts())
     return combined_df
 
 
-def train_model():
-    df = load_and_combine(DATA_PATHS)
+def iter_chunks(paths, chunk_size, clean=False):
+    """streams cleaned (text, label) frames from every CSV without loading whole files"""
+    for name, path in paths.items():
+        if not os.path.exists(path):
+            print(f"⚠️ File not found: {path}")
+            continue
+
+        text_col = None
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            if text_col is None:
+                text_col = find_text_column(chunk.columns)
+                if text_col is None:
+                    print(f"⚠️ No text column found in {name}, skipping")
+                    break
+            yield prepare_frame(chunk, text_col, name, clean)
+
+
+def split_chunk(chunk, test_every=5):
+    """deterministic ~20% holdout by text hash, so every pass sees the same split"""
+    is_test = (pd.util.hash_pandas_object(chunk["text"], index=False) % test_every == 0).to_numpy()
+    return chunk[~is_test], chunk[is_test]
+
+
+def peak_memory_mb():
+    """peak resident memory of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None  # not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux but bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def parse_data_paths(entries):
+    """turns --data entries ("name=path", paths or globs) into a DATA_PATHS dict"""
+    paths = {}
+    for entry in entries:
+        name, _, path = entry.rpartition("=") if "=" in entry else ("", "", entry)
+        matches = sorted(glob.glob(path)) or [path]
+        for match in matches:
+            key = name if name and len(matches) == 1 else os.path.splitext(os.path.basename(match))[0]
+            paths[key] = match
+    return paths
+
+
+def build_vectorizer(feature_mode="tfidf"):
+    """builds the feature pipeline for the chosen mode"""
+    if feature_mode == "hashing":
+        # counts only, the tf-idf step adds sublinear tf + idf + l2 like the vocabulary mode
+        return make_pipeline(
+            HashingVectorizer(
+                n_features=HASHING_N_FEATURES,
+                stop_words="english",
+                alternate_sign=False,
+                norm=None
+            ),
+            TfidfTransformer(sublinear_tf=True)
+        )
+
+    return TfidfVectorizer(
+        sublinear_tf=True,  # smooths term frequencies
+        stop_words="english",
+        max_features=5000   # optional: limits feature space for faster training
+    )
+
+
+def train_model(feature_mode="tfidf", clean=False, publish=False):
+    if feature_mode not in FEATURE_MODES:
+        raise ValueError(f"Unknown feature mode '{feature_mode}'. Use one of: {', '.join(FEATURE_MODES)}")
+
+    df = load_and_combine(DATA_PATHS, clean)
 
     X = df["text"]
     y = df["label"].astype(int)
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    vectorizer = TfidfVectorizer(
-    sublinear_tf=True,  # smooths term frequencies
-    stop_words="english",
-    max_features=5000   # optional: limits feature space for faster training
-)
+    vectorizer = build_vectorizer(feature_mode)
+    print(f"🔧 Feature mode: {feature_mode}")
 
     X_train_features = vectorizer.fit_transform(X_train)
     X_test_features = vectorizer.transform(X_test)
@@ -84,8 +217,11 @@ def train_model():
 
     y_pred = model.predict(X_test_features)
 
-    print("✅ Train Accuracy:", accuracy_score(y_train, model.predict(X_train_features)))
-    print("✅ Test Accuracy:", accuracy_score(y_test, y_pred))
+    train_accuracy = accuracy_score(y_train, model.predict(X_train_features))
+    test_accuracy = accuracy_score(y_test, y_pred)
+    print("✅ Train Accuracy:", train_accuracy)
+    print("✅ Test Accuracy:", test_accuracy)
+    print(f"📈 Peak memory: {peak_memory_mb()} MB")
 
     # Save model + vectorizer
     os.makedirs("models", exist_ok=True)
@@ -93,6 +229,122 @@ def train_model():
     joblib.dump(vectorizer, "models/vectorizer.pkl")
     print("💾 Model and vectorizer saved in /models/")
 
+    # pickle-free, memory-mappable copy that the servers load first
+    metadata = {
+        "featureMode": feature_mode,
+        "trainingMode": "in-memory",
+        "cleanText": clean,
+        "trainAccuracy": float(train_accuracy),
+        "testAccuracy": float(test_accuracy),
+        "trainSize": int(len(X_train))
+    }
+    export_compact_model(model, vectorizer, "models/phishing_model.smodel", metadata=metadata)
+    print("💾 Compact model saved to /models/phishing_model.smodel")
+
+    if publish:
+        version = publish_model("models", model, vectorizer, metadata)
+        print(f"🚀 Published {version} to /models/registry/ (running servers hot-swap to it)")
+
+
+def train_model_chunked(paths=None, chunk_size=50000, clean=False, publish=False):
+    """out-of-core training: hashing features + MultinomialNB.partial_fit per chunk
+
+    pass 1 streams the CSVs to count document frequencies for the idf, pass 2
+    trains chunk by chunk and pass 3 scores the held-out rows, so memory stays
+    bounded by the chunk size rather than the dataset size
+    """
+    paths = paths or DATA_PATHS
+    started = time.time()
+
+    vectorizer = build_vectorizer("hashing")
+    hasher, tfidf = vectorizer.steps[0][1], vectorizer.steps[-1][1]
+
+    # pass 1 - document frequencies over the training rows
+    doc_freq = np.zeros(HASHING_N_FEATURES, dtype=np.int64)
+    n_docs = 0
+    for chunk in iter_chunks(paths, chunk_size, clean):
+        train, _ = split_chunk(chunk)
+        if len(train):
+            counts = hasher.transform(train["text"])
+            doc_freq += np.bincount(counts.indices, minlength=HASHING_N_FEATURES)
+            n_docs += counts.shape[0]
+
+    if n_docs == 0:
+        raise ValueError("❌ No valid datasets loaded!")
+
+    # same smoothed idf TfidfTransformer.fit would compute
+    tfidf.idf_ = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+    tfidf.n_features_in_ = HASHING_N_FEATURES
+    print(f"📊 Document frequencies from {n_docs} training emails")
+
+    # pass 2 - incremental fit
+    model = MultinomialNB()
+    classes = np.array([0, 1])
+    chunks_seen = 0
+    for chunk in iter_chunks(paths, chunk_size, clean):
+        train, _ = split_chunk(chunk)
+        if len(train):
+            model.partial_fit(vectorizer.transform(train["text"]), train["label"].astype(int), classes=classes)
+            chunks_seen += 1
+            print(f"   chunk {chunks_seen}: {len(train)} emails")
+
+    # pass 3 - held-out accuracy
+    correct = tested = 0
+    for chunk in iter_chunks(paths, chunk_size, clean):
+        _, test = split_chunk(chunk)
+        if len(test):
+            predictions = model.predict(vectorizer.transform(test["text"]))
+            correct += int((predictions == test["label"].astype(int).to_numpy()).sum())
+            tested += len(test)
+
+    test_accuracy = correct / tested if tested else None
+    peak_mb = peak_memory_mb()
+    print("✅ Test Accuracy:", test_accuracy)
+    print(f"📈 Peak memory: {peak_mb} MB" if peak_mb is not None else "📈 Peak memory: unavailable on this platform")
+    print(f"⏱️ Trained in {time.time() - started:.1f}s")
+
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(model, "models/phishing_model.pkl")
+    joblib.dump(vectorizer, "models/vectorizer.pkl")
+    metadata = {
+        "featureMode": "hashing",
+        "trainingMode": "chunked",
+        "chunkSize": chunk_size,
+        "cleanText": clean,
+        "testAccuracy": test_accuracy,
+        "trainSize": n_docs,
+        "peakMemoryMB": peak_mb
+    }
+    export_compact_model(model, vectorizer, "models/phishing_model.smodel", metadata=metadata)
+    print("💾 Model, vectorizer and compact model saved in /models/")
+
+    if publish:
+        version = publish_model("models", model, vectorizer, metadata)
+        print(f"🚀 Published {version} to /models/registry/ (running servers hot-swap to it)")
+
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the phishing detection model")
+    parser.add_argument("--features", choices=FEATURE_MODES, default="tfidf",
+                        help="feature pipeline: fitted tf-idf vocabulary or stateless hashing")
+    parser.add_argument("--chunked", action="store_true",
+                        help="stream the CSVs and train with partial_fit (needs --features hashing)")
+    parser.add_argument("--chunk-size", type=int, default=50000,
+                        help="rows per CSV chunk in chunked mode")
+    parser.add_argument("--data", nargs="+", metavar="[NAME=]PATH",
+                        help="training CSVs (paths or globs), replaces DATA_PATHS")
+    parser.add_argument("--clean", action="store_true",
+                        help="strip URLs, emails, punctuation and stopwords before vectorizing")
+    parser.add_argument("--publish", action="store_true",
+                        help="also publish the model as a new version in /models/registry/")
+    args = parser.parse_args()
+
+    if args.data:
+        DATA_PATHS = parse_data_paths(args.data)
+
+    if args.chunked:
+        if args.features != "hashing":
+            parser.error("--chunked needs --features hashing (a vocabulary can't be fitted incrementally)")
+        train_model_chunked(DATA_PATHS, args.chunk_size, args.clean, args.publish)
+    else:
+        train_model(args.features, args.clean, args.publish)
@@ -3,58 +3,348 @@
 combines phishing detection + social media exposure analyzer
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import os
 import sys
-from dotenv import load_dotenv
-import joblib
+import json
 
 # adds parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.smea.instagram_service import InstagramService
-from src.smea.facebook_service import FacebookService
-from src.smea.pii_engine import PIIEngine
-from src.smea.risk_model import RiskModel
+from utils.startup import (
+    StartupProfiler, LazyComponent, parse_features, parse_warmup_mode, warm_up_in_background
+)
+
+# started before the first heavy import so --startup-profile sees all of it
+startup_profiler = StartupProfiler()
+
+with startup_profiler.track("flask", "import"):
+    from flask import Flask, Response, request, jsonify
+    from flask_cors import CORS
+    from dotenv import load_dotenv
+
+# light modules only - numpy/sklearn/joblib and apify_client load with their feature
+from src.smea.admission import (
+    AdmissionController, AdmissionPolicy, ConcurrencyLimiter, RateLimiter, install_admission_control,
+    parse_api_keys
+)
+from src.smea.analysis_pipeline import AnalysisPipeline, PlatformAdapter
+from src.smea.metrics import CONTENT_TYPE, counter, histogram, render_metrics, start_metrics_writer
+from src.smea.response_encoding import install_compression, install_json_provider
+from src.smea.request_profiler import ADMIN_TOKEN_HEADER, install_request_profiling, is_profiling, token_matches
+from src.smea.structured_logging import (
+    configure_logging, install_request_ids, start_log_listener
+)
+from utils.micro_batcher import MicroBatcher
+from utils.prediction_cache import PredictionCache
+from utils.model_registry import ModelRegistry
+from utils.online_learner import FeedbackTrainer, UnverifiedFeedbackLog, parse_label
 
 # loads environment variables
 load_dotenv()
 
+# LOG_LEVEL / LOG_FORMAT - request logging goes through a background writer thread,
+# started after fork when start_backend.py --production preloads the app
+configure_logging(start_listener=os.getenv("BACKEND_PRELOAD") != "1")
+
+# which subsystems this worker serves, e.g. BACKEND_FEATURES=phishing
+ENABLED_FEATURES = parse_features(os.getenv("BACKEND_FEATURES"))
+# eager (load at import), background (warm up in a thread) or lazy (first request)
+BACKEND_WARMUP = parse_warmup_mode(os.getenv("BACKEND_WARMUP"))
+
 app = Flask(__name__)
 CORS(app)  # allows frontend to connect
+# orjson for jsonify (JSON_ENCODER), gzip/brotli above RESPONSE_COMPRESSION_MIN_BYTES
+install_json_provider(app)
+install_compression(app)
+install_request_ids(app)
+
+# per-client token buckets (an X-API-Key listed in API_KEYS, else IP) like "600/min,60" = 600 a minute, bursts of 60;
+# analyze requests also share a cap on concurrent actor runs with a bounded wait queue
+actor_run_limiter = ConcurrencyLimiter(
+    int(os.getenv("MAX_CONCURRENT_ACTOR_RUNS", "4")),
+    max_waiting=int(os.getenv("ACTOR_RUN_QUEUE_SIZE", "8")),
+    wait_secs=float(os.getenv("ACTOR_RUN_QUEUE_WAIT_SECS", "15"))
+)
+admission = AdmissionController(
+    trust_proxy=os.getenv("ADMISSION_TRUST_PROXY") == "1", api_keys=parse_api_keys(os.getenv("API_KEYS"))
+)
+admission.limit(["predict_phishing", "predict_legacy"], AdmissionPolicy(
+    "predict", RateLimiter.from_spec(os.getenv("RATE_LIMIT_PREDICT", "600/min,60"))
+))
+admission.limit(["predict_phishing_batch"], AdmissionPolicy(
+    "predict_batch", RateLimiter.from_spec(os.getenv("RATE_LIMIT_PREDICT_BATCH", "60/min,10"))
+))
+admission.limit(["phishing_feedback"], AdmissionPolicy(
+    "feedback", RateLimiter.from_spec(os.getenv("RATE_LIMIT_FEEDBACK", "60/min,20"))
+))
+admission.limit(["phishing_report"], AdmissionPolicy(
+    "report", RateLimiter.from_spec(os.getenv("RATE_LIMIT_REPORT", "10/min,5"))
+))
+admission.limit(["analyze_instagram", "analyze_facebook"], AdmissionPolicy(
+    "analyze", RateLimiter.from_spec(os.getenv("RATE_LIMIT_ANALYZE", "6/min,3")), actor_run_limiter
+))
+install_admission_control(app, admission)
+# X-Profile: 1 + X-Admin-Token samples one request; only installed with PROFILING_ADMIN_TOKEN
+install_request_profiling(app)
+
+
+def feature_disabled(feature):
+    return jsonify({
+        "success": False,
+        "error": f"{feature.capitalize()} is disabled on this server (BACKEND_FEATURES)"
+    }), 503
 
 # ============================================================================
 # LOAD PHISHING DETECTION MODEL
 # ============================================================================
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "models/phishing_model.pkl")
 VECTORIZER_PATH = os.path.join(os.path.dirname(__file__), "models/vectorizer.pkl")
-
-phishing_model = None
-vectorizer = None
-
-try:
-    if os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH):
-        phishing_model = joblib.load(MODEL_PATH)
-        vectorizer = joblib.load(VECTORIZER_PATH)
-        print("[OK] Phishing detection model loaded successfully")
-    else:
-        print("[WARNING] Phishing model files not found. Phishing detection will be unavailable.")
-        print(f"   Expected: {MODEL_PATH}")
-except Exception as e:
-    print(f"[WARNING] Error loading phishing model: {str(e)}")
-
+# pickle-free export of the same model, memory-mapped so workers share its pages
+COMPACT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models/phishing_model.smodel")
+# versioned models published by train_model.py --publish live under models/registry/
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+# "numpy" serves the compact model without importing sklearn, "sklearn" rebuilds the estimators
+PHISHING_SERVE_MODE = os.getenv("PHISHING_SERVE_MODE", "numpy").lower()
+# how often the registry checks for a new model version (0 turns hot-swapping off)
+PHISHING_MODEL_POLL_SECS = float(os.getenv("PHISHING_MODEL_POLL_SECS", "5"))
+
+
+def load_phishing_artifacts(path):
+    """loads (model, vectorizer) from a compact model or the legacy pickle pair"""
+    if path.endswith(".smodel"):
+        if PHISHING_SERVE_MODE == "numpy":
+            from utils.fast_inference import load_numpy_estimators
+            return load_numpy_estimators(path)
+        from utils.compact_model import load_compact_model
+        return load_compact_model(path).to_sklearn()
+    import joblib
+    return joblib.load(path), joblib.load(os.path.join(os.path.dirname(path), "vectorizer.pkl"))
+
+
+def on_model_swap(active):
+    # cached predictions belong to the previous version
+    prediction_cache.set_model_version(active.version)
+
+
+model_registry = ModelRegistry(
+    MODELS_DIR,
+    loader=load_phishing_artifacts,
+    legacy_paths=[COMPACT_MODEL_PATH] + ([MODEL_PATH] if os.path.exists(VECTORIZER_PATH) else []),
+    poll_interval=PHISHING_MODEL_POLL_SECS,
+    on_swap=on_model_swap
+)
 
 # ============================================================================
 # PHISHING DETECTION ENDPOINTS
 # ============================================================================
 
-@app.route("/phishing/predict", methods=["POST"])
-def predict_phishing():
-    if phishing_model is None or vectorizer is None:
+# caps a single batch request so one client can't pin a worker
+MAX_BATCH_SIZE = 5000
+
+# micro-batching of concurrent /phishing/predict calls (max size 1 turns it off)
+PHISHING_BATCH_MAX_SIZE = int(os.getenv("PHISHING_BATCH_MAX_SIZE", "32"))
+PHISHING_BATCH_MAX_WAIT_MS = float(os.getenv("PHISHING_BATCH_MAX_WAIT_MS", "5"))
+
+# LRU cache of predictions for repeated campaign emails (0 turns it off)
+PHISHING_CACHE_SIZE = int(os.getenv("PHISHING_CACHE_SIZE", "10000"))
+prediction_cache = PredictionCache(max_entries=PHISHING_CACHE_SIZE)
+
+
+
+def import_phishing_modules():
+    """numpy inference code, plus sklearn when it rebuilds the estimators"""
+    import utils.fast_inference  # noqa: F401
+    if PHISHING_SERVE_MODE != "numpy":
+        import sklearn.naive_bayes  # noqa: F401
+        import sklearn.feature_extraction.text  # noqa: F401
+
+
+def load_initial_phishing_model():
+    """first model load - later versions arrive through the registry watcher
+
+    may run in a preloading master, so it starts no threads; start_background_workers
+    starts the watcher
+    """
+    try:
+        if model_registry.refresh():
+            print(f"[OK] Phishing detection model loaded successfully ({PHISHING_SERVE_MODE} inference)")
+        else:
+            print("[WARNING] Phishing model files not found. Phishing detection will be unavailable.")
+            print(f"   Expected: {MODEL_PATH}")
+    except Exception as e:
+        print(f"[WARNING] Error loading phishing model: {str(e)}")
+
+
+phishing_imports = LazyComponent("phishing", import_phishing_modules, startup_profiler, phase="import")
+phishing_model_loader = LazyComponent("phishing", load_initial_phishing_model, startup_profiler)
+
+
+def phishing_unavailable():
+    """error response when this worker can't classify emails, None when it can"""
+    if "phishing" not in ENABLED_FEATURES:
+        return feature_disabled("phishing detection")
+
+    # lazy mode loads the model on the first phishing request
+    phishing_imports.get()
+    phishing_model_loader.get()
+    if model_registry.current is None:
         return jsonify({
             "error": "Phishing detection model not available. Please run train_model.py first."
         }), 503
+    return None
+
+# analyst feedback is applied with partial_fit every interval once enough has queued;
+# only callers with FEEDBACK_ADMIN_TOKEN in X-Admin-Token may send it
+FEEDBACK_ADMIN_TOKEN = os.getenv("FEEDBACK_ADMIN_TOKEN")
+PHISHING_FEEDBACK_MIN_BATCH = int(os.getenv("PHISHING_FEEDBACK_MIN_BATCH", "20"))
+PHISHING_FEEDBACK_INTERVAL_SECS = float(os.getenv("PHISHING_FEEDBACK_INTERVAL_SECS", "60"))
+feedback_trainer = FeedbackTrainer(
+    model_registry,
+    MODELS_DIR,
+    min_batch=PHISHING_FEEDBACK_MIN_BATCH,
+    interval_secs=PHISHING_FEEDBACK_INTERVAL_SECS
+)
+# end-user labels from the trainer UI wait here for an analyst instead of reaching the model
+unverified_feedback = UnverifiedFeedbackLog(
+    os.getenv("UNVERIFIED_FEEDBACK_PATH", os.path.join(MODELS_DIR, "feedback", "unverified.jsonl")),
+    max_bytes=int(float(os.getenv("UNVERIFIED_FEEDBACK_MAX_MB", "100")) * 1024 * 1024)
+)
+
+
+PHISHING_INFERENCE_SECONDS = histogram(
+    "smea_phishing_inference_seconds", "Phishing model transform + predict time per call"
+)
+CACHE_LOOKUPS = counter("smea_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+# the prediction cache already counts its hits and misses, read at scrape time
+CACHE_LOOKUPS.set_callback(lambda: {
+    ("prediction", "hit"): prediction_cache.hits,
+    ("prediction", "miss"): prediction_cache.misses
+})
+
+
+@PHISHING_INFERENCE_SECONDS.timed(stage="phishing_inference")
+def classify_emails(email_texts, explain_top_k=0):
+    """classifies a list of emails with one transform + predict_proba call
+
+    explain_top_k > 0 adds the tokens that pushed each email towards its label
+    """
+    # one snapshot per batch so a hot-swap never mixes two model versions
+    active = model_registry.current
+    features = active.vectorizer.transform(email_texts)
+
+    try:
+        probabilities = active.model.predict_proba(features)
+    except AttributeError:
+        # models without probabilities still get labels, just no confidence
+        return [
+            {
+                "prediction": int(prediction),
+                "label": "phishing" if prediction == 1 else "legit",
+                "confidence": None,
+                "modelVersion": active.version
+            }
+            for prediction in active.model.predict(features)
+        ]
+
+    # labels come from the same probabilities instead of a second predict() pass
+    best = probabilities.argmax(axis=1)
+    predictions = active.model.classes_[best]
+    confidences = probabilities[range(len(best)), best] * 100
+
+    results = [
+        {
+            "prediction": int(prediction),
+            "label": "phishing" if prediction == 1 else "legit",
+            "confidence": float(confidence),
+            "modelVersion": active.version
+        }
+        for prediction, confidence in zip(predictions, confidences)
+    ]
+
+    if explain_top_k > 0:
+        from utils.explain import explain_predictions
+
+        # reuses the sparse rows above, no second transform
+        explanations = explain_predictions(
+            active.model, active.vectorizer, email_texts, features, best, explain_top_k
+        )
+        for result, explanation in zip(results, explanations):
+            result["explanation"] = explanation
+
+    return results
+
+
+def classify_emails_cached(email_texts):
+    """classifies emails, only sending cache misses through the model"""
+    results = [prediction_cache.get(email_text) for email_text in email_texts]
+    missing = [index for index, result in enumerate(results) if result is None]
+
+    if missing:
+        classified = classify_emails([email_texts[index] for index in missing])
+        for index, result in zip(missing, classified):
+            prediction_cache.put(email_texts[index], result, result["modelVersion"])
+            results[index] = result
+
+    return results
+
+
+phishing_batcher = None
+if PHISHING_BATCH_MAX_SIZE > 1:
+    phishing_batcher = MicroBatcher(
+        classify_emails,
+        max_batch_size=PHISHING_BATCH_MAX_SIZE,
+        max_wait_ms=PHISHING_BATCH_MAX_WAIT_MS,
+        autostart=False
+    )
+
+
+def parse_explain_top_k(data):
+    """reads explain/topK from the JSON body or query string, 0 when not requested"""
+    data = data if isinstance(data, dict) else {}
+    explain = data.get("explain", request.args.get("explain", False))
+    if isinstance(explain, str):
+        explain = explain.lower() in ("1", "true", "yes")
+    if not explain:
+        return 0
+
+    from utils.explain import DEFAULT_TOP_K, MAX_TOP_K
+
+    top_k = int(data.get("topK", request.args.get("topK", DEFAULT_TOP_K)))
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise ValueError(f"topK must be between 1 and {MAX_TOP_K}")
+    return top_k
+
+
+def parse_batch_emails():
+    """reads a batch as a JSON array, {"emails": [...]} or NDJSON lines"""
+    if request.mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        entries = [
+            json.loads(line)
+            for line in request.get_data(as_text=True).splitlines()
+            if line.strip()
+        ]
+    else:
+        data = request.get_json()
+        entries = data.get("emails") if isinstance(data, dict) else data
+
+    if not isinstance(entries, list):
+        raise ValueError("Expected a list of emails")
+
+    # entries are plain strings or {"id": ..., "email": ...} objects
+    items = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            items.append((entry.get("id"), entry.get("email", "")))
+        else:
+            items.append((None, entry))
+    return items
+
+
+@app.route("/phishing/predict", methods=["POST"])
+def predict_phishing():
+    unavailable = phishing_unavailable()
+    if unavailable is not None:
+        return unavailable
     
     try:
         data = request.get_json()
@@ -63,27 +353,38 @@ def predict_phishing():
         if not email_text.strip():
             return jsonify({"error": "No email text provided"}), 400
 
-        # Transform input with the trained vectorizer
-        features = vectorizer.transform([email_text])
-        prediction = phishing_model.predict(features)[0]
-        
-        # Get prediction probability if available
         try:
-            probabilities = phishing_model.predict_proba(features)[0]
-            confidence = float(max(probabilities) * 100)
-        except:
-            confidence = None
-
-        label = "phishing" if prediction == 1 else "legit"
-
-        return jsonify({
+            explain_top_k = parse_explain_top_k(data)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid explain request: {str(e)}"}), 400
+
+        # explanations aren't cached, so they skip the cache and the batcher; so does a
+        # profiled request, whose inference has to run on its own (sampled) thread
+        if explain_top_k or is_profiling():
+            result = classify_emails([email_text], explain_top_k)[0]
+        else:
+            result = prediction_cache.get(email_text)
+        if result is None:
+            # concurrent single-email calls share one matrix pass through the batcher
+            if phishing_batcher is not None:
+                result = phishing_batcher.submit(email_text)
+            else:
+                result = classify_emails([email_text])[0]
+            prediction_cache.put(email_text, result, result["modelVersion"])
+        label = result["label"]
+
+        response = {
             "success": True,
             "email": email_text[:200] + "..." if len(email_text) > 200 else email_text,
-            "prediction": int(prediction),
+            "prediction": result["prediction"],
             "label": label,
-            "confidence": confidence,
+            "confidence": result["confidence"],
+            "modelVersion": result["modelVersion"],
             "message": f"Email classified as {label}"
-        })
+        }
+        if "explanation" in result:
+            response["explanation"] = result["explanation"]
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({
@@ -91,11 +392,175 @@ def predict_phishing():
             "error": f"Prediction failed: {str(e)}"
         }), 500
 
+@app.route("/phishing/predict_batch", methods=["POST"])
+def predict_phishing_batch():
+    """classifies many emails in one vectorizer/model pass"""
+    unavailable = phishing_unavailable()
+    if unavailable is not None:
+        return unavailable
+
+    try:
+        items = parse_batch_emails()
+        # NDJSON bodies can only ask for explanations in the query string
+        explain_top_k = parse_explain_top_k(request.get_json(silent=True) if request.is_json else None)
+    except (ValueError, AttributeError) as e:
+        return jsonify({"success": False, "error": f"Invalid batch: {str(e)}"}), 400
+
+    if not items:
+        return jsonify({"error": "No emails provided"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch too large (max {MAX_BATCH_SIZE} emails)"}), 413
+
+    try:
+        # only non-empty emails go through the model, in a single matrix
+        valid = [
+            index for index, (_, email_text) in enumerate(items)
+            if isinstance(email_text, str) and email_text.strip()
+        ]
+        texts = [items[index][1] for index in valid]
+        if not texts:
+            classified = []
+        elif explain_top_k:
+            classified = classify_emails(texts, explain_top_k)
+        else:
+            classified = classify_emails_cached(texts)
+        by_index = dict(zip(valid, classified))
+
+        results = []
+        for index, (item_id, _) in enumerate(items):
+            result = {"index": index}
+            if item_id is not None:
+                result["id"] = item_id
+            if index in by_index:
+                result.update(by_index[index])
+            else:
+                result["error"] = "No email text provided"
+            results.append(result)
+
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "classified": len(valid),
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Batch prediction failed: {str(e)}"
+        }), 500
+
+@app.route("/phishing/cache", methods=["GET"])
+def phishing_cache_stats():
+    """reports prediction cache hit/miss counters"""
+    return jsonify(prediction_cache.stats())
+
+@app.route("/phishing/model", methods=["GET"])
+def phishing_model_status():
+    """reports the active model version and the last hot-swap error, if any"""
+    return jsonify(model_registry.status())
+
+def parse_feedback_samples(data):
+    """(email, label) pairs from {"email", "label"} or {"feedback": [{"email", "label"}, ...]}"""
+    entries = data.get("feedback", [data]) if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Expected feedback entries")
+
+    samples = []
+    for entry in entries:
+        email_text = entry.get("email", "")
+        if not isinstance(email_text, str) or not email_text.strip():
+            raise ValueError("No email text provided")
+        samples.append((email_text, parse_label(entry.get("label"))))
+    return samples
+
+
+@app.route("/phishing/feedback", methods=["POST"])
+def phishing_feedback():
+    """queues analyst-labeled emails for the next online model update"""
+    if not token_matches(FEEDBACK_ADMIN_TOKEN, request.headers.get(ADMIN_TOKEN_HEADER)):
+        return jsonify({
+            "success": False,
+            "error": "Model feedback needs a valid analyst token (X-Admin-Token)"
+        }), 403
+
+    unavailable = phishing_unavailable()
+    if unavailable is not None:
+        return unavailable
+
+    try:
+        samples = parse_feedback_samples(request.get_json())
+    except (ValueError, AttributeError, TypeError) as e:
+        return jsonify({"success": False, "error": f"Invalid feedback: {str(e)}"}), 400
+    if len(samples) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Too much feedback at once (max {MAX_BATCH_SIZE} emails)"}), 413
+
+    buffered = feedback_trainer.add(samples)
+    return jsonify({
+        "success": True,
+        "accepted": len(samples),
+        "buffered": buffered,
+        "modelVersion": model_registry.current.version,
+        "message": "Feedback queued for the next model update"
+    })
+
+@app.route("/phishing/report", methods=["POST"])
+def phishing_report():
+    """records an end user's label for offline review - it never reaches the model directly"""
+    if "phishing" not in ENABLED_FEATURES:
+        return feature_disabled("phishing detection")
+
+    try:
+        samples = parse_feedback_samples(request.get_json())
+    except (ValueError, AttributeError, TypeError) as e:
+        return jsonify({"success": False, "error": f"Invalid report: {str(e)}"}), 400
+    if len(samples) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Too much feedback at once (max {MAX_BATCH_SIZE} emails)"}), 413
+
+    active = model_registry.current
+    if not unverified_feedback.record(samples, active.version if active else None):
+        return jsonify({"success": False, "error": "The review queue is full, try again later"}), 503
+    return jsonify({
+        "success": True,
+        "accepted": len(samples),
+        "message": "Label recorded for review"
+    }), 202
+
+@app.route("/phishing/feedback", methods=["GET"])
+def phishing_feedback_stats():
+    """reports queued/applied feedback, the last promoted version and the review log"""
+    return jsonify(dict(feedback_trainer.stats(), unverified=unverified_feedback.stats()))
+
 @app.route("/predict", methods=["POST"])
 def predict_legacy():
     """Legacy endpoint for backward compatibility"""
     return predict_phishing()
 
+# ============================================================================
+# SOCIAL MEDIA SERVICES (imported on first use - apify_client is heavy)
+# ============================================================================
+
+def import_instagram_service():
+    from src.smea.instagram_service import InstagramService
+    return InstagramService
+
+
+def import_facebook_service():
+    from src.smea.facebook_service import FacebookService
+    return FacebookService
+
+
+instagram_service_class = LazyComponent("instagram", import_instagram_service, startup_profiler, phase="import")
+facebook_service_class = LazyComponent("facebook", import_facebook_service, startup_profiler, phase="import")
+
+# one PIIEngine/RiskModel pair shared by both platforms' requests
+analysis_pipeline = AnalysisPipeline([
+    PlatformAdapter("instagram", "username", "Username",
+                    lambda: instagram_service_class.get().create_service()),
+    PlatformAdapter("facebook", "pageUrl", "Page URL",
+                    lambda: facebook_service_class.get().create_service())
+])
+
 # ============================================================================
 # INSTAGRAM ANALYSIS ENDPOINTS
 # ============================================================================
@@ -103,8 +568,11 @@ def predict_legacy():
 @app.route("/instagram/validate", methods=["GET"])
 def validate_instagram_service():
     """Validates Instagram service configuration"""
+    if "instagram" not in ENABLED_FEATURES:
+        return feature_disabled("instagram analysis")
+
     try:
-        instagram_service = InstagramService.create_service()
+        instagram_service = instagram_service_class.get().create_service()
         validation_result = instagram_service.validate_token()
         
         if validation_result["valid"]:
@@ -128,74 +596,11 @@ def validate_instagram_service():
 @app.route("/instagram/analyze", methods=["POST"])
 def analyze_instagram():
     """Analyzes Instagram profile for PII exposure"""
-    try:
-        data = request.get_json()
-        username = data.get("username", "").strip()
+    if "instagram" not in ENABLED_FEATURES:
+        return feature_disabled("instagram analysis")
 
-        if not username:
-            return jsonify({"error": "Username is required"}), 400
-
-        print(f"[INFO] Starting analysis for @{username}")
-
-        # Initialize services
-        instagram_service = InstagramService.create_service()
-        pii_engine = PIIEngine()
-        risk_model = RiskModel()
-
-        # Get Instagram data
-        user_data = instagram_service.get_user_data(username)
-        print(f"[OK] Retrieved data for @{username}")
-        
-        # Extract text content for analysis
-        text_content = instagram_service.extract_text_content(user_data)
-        print(f"[INFO] Extracted text content: {len(text_content.get('posts', []))} posts")
-        
-        # Run PII analysis
-        findings = pii_engine.scan_for_pii(text_content)
-        print(f"[WARNING] Found {len(findings)} PII findings")
-        
-        # Calculate risk assessment
-        analysis_data = [{"platform": "instagram", "findings": findings}]
-        risk_score = risk_model.calculate_risk_score(analysis_data)
-        risk_level = risk_model.get_risk_level(risk_score)
-        recommendations = risk_model.generate_recommendations(analysis_data)
-        
-        print(f"[INFO] Risk score: {risk_score}/100 ({risk_level})")
-        
-        # Prepare response
-        response_data = {
-            "success": True,
-            "userData": user_data,
-            "textContent": text_content,
-            "findings": findings,
-            "riskScore": risk_score,
-            "riskLevel": risk_level,
-            "recommendations": recommendations[:8],  # Limit to top 8
-            "totalFindings": len(findings),
-            "severityBreakdown": pii_engine.get_summary(findings),
-            "profileStats": {
-                "postsAnalyzed": len(text_content.get("posts", [])),
-                "commentsAnalyzed": len(text_content.get("comments", [])),
-                "totalTextLength": len(" ".join([
-                    text_content.get("bio", ""),
-                    *text_content.get("posts", []),
-                    *text_content.get("comments", [])
-                ])),
-                "hasProfilePicture": bool(user_data.get("user", {}).get("profilePictureUrl")),
-                "isVerified": user_data.get("user", {}).get("isVerified", False)
-            }
-        }
-        
-        return jsonify(response_data)
-
-    except ValueError as e:
-        error_msg = f"Configuration error: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        return jsonify({"success": False, "error": error_msg}), 500
-    except Exception as e:
-        error_msg = f"Analysis failed: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        return jsonify({"success": False, "error": error_msg}), 500
+    body, status, headers = analysis_pipeline.handle("instagram", request.get_json(silent=True), request.args)
+    return jsonify(body), status, headers
 
 # ============================================================================
 # FACEBOOK ANALYSIS ENDPOINTS
@@ -204,8 +609,11 @@ def analyze_instagram():
 @app.route("/facebook/validate", methods=["GET"])
 def validate_facebook_service():
     """Validates Facebook service configuration"""
+    if "facebook" not in ENABLED_FEATURES:
+        return feature_disabled("facebook analysis")
+
     try:
-        facebook_service = FacebookService.create_service()
+        facebook_service = facebook_service_class.get().create_service()
         validation_result = facebook_service.validate_token()
         
         if validation_result["valid"]:
@@ -229,74 +637,23 @@ def validate_facebook_service():
 @app.route("/facebook/analyze", methods=["POST"])
 def analyze_facebook():
     """Analyzes Facebook page for PII exposure"""
-    try:
-        data = request.get_json()
-        page_url = data.get("pageUrl", "").strip()
+    if "facebook" not in ENABLED_FEATURES:
+        return feature_disabled("facebook analysis")
 
-        if not page_url:
-            return jsonify({"error": "Page URL is required"}), 400
+    body, status, headers = analysis_pipeline.handle("facebook", request.get_json(silent=True), request.args)
+    return jsonify(body), status, headers
 
-        print(f"[INFO] Starting Facebook analysis for {page_url}")
-
-        # Initialize services
-        facebook_service = FacebookService.create_service()
-        pii_engine = PIIEngine()
-        risk_model = RiskModel()
+# ============================================================================
+# MONITORING
+# ============================================================================
 
-        # Get Facebook data
-        user_data = facebook_service.get_user_data(page_url)
-        print(f"[INFO] Retrieved data for {user_data.get('user', {}).get('name', 'Unknown')}")
-        
-        # Extract text content for analysis
-        text_content = facebook_service.extract_text_content(user_data)
-        print(f"[INFO] Extracted text content: {len(text_content.get('posts', []))} posts")
-        
-        # Run PII analysis
-        findings = pii_engine.scan_for_pii(text_content)
-        print(f"[WARNING] Found {len(findings)} PII findings")
-        
-        # Calculate risk assessment
-        analysis_data = [{"platform": "facebook", "findings": findings}]
-        risk_score = risk_model.calculate_risk_score(analysis_data)
-        risk_level = risk_model.get_risk_level(risk_score)
-        recommendations = risk_model.generate_recommendations(analysis_data)
-        
-        print(f"[INFO] Risk score: {risk_score}/100 ({risk_level})")
-        
-        # Prepare response
-        response_data = {
-            "success": True,
-            "userData": user_data,
-            "textContent": text_content,
-            "findings": findings,
-            "riskScore": risk_score,
-            "riskLevel": risk_level,
-            "recommendations": recommendations[:8],  # Limit to top 8
-            "totalFindings": len(findings),
-            "severityBreakdown": pii_engine.get_summary(findings),
-            "profileStats": {
-                "postsAnalyzed": len(text_content.get("posts", [])),
-                "commentsAnalyzed": len(text_content.get("comments", [])),
-                "totalTextLength": len(" ".join([
-                    text_content.get("bio", ""),
-                    *text_content.get("posts", []),
-                    *text_content.get("comments", [])
-                ])),
-                "hasProfilePicture": bool(user_data.get("user", {}).get("profilePictureUrl")),
-                "isVerified": user_data.get("user", {}).get("isVerified", False)
-            }
-        }
-        
-        return jsonify(response_data)
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """stage latency histograms and counters in the Prometheus text format
 
-    except ValueError as e:
-        error_msg = f"Configuration error: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        return jsonify({"success": False, "error": error_msg}), 500
-    except Exception as e:
-        error_msg = f"Analysis failed: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        return jsonify({"success": False, "error": error_msg}), 500
+    totals of every worker when METRICS_MULTIPROC_DIR is set, else this process's
+    """
+    return Response(render_metrics(), mimetype=CONTENT_TYPE)
 
 # ============================================================================
 # ERROR HANDLERS
@@ -310,11 +667,71 @@ def not_found(error):
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
+# ============================================================================
+# STARTUP
+# ============================================================================
+
+def enabled_components():
+    """lazy components of the enabled features, in warm-up order"""
+    components = []
+    if "phishing" in ENABLED_FEATURES:
+        components += [phishing_imports, phishing_model_loader]
+    if "instagram" in ENABLED_FEATURES:
+        components.append(instagram_service_class)
+    if "facebook" in ENABLED_FEATURES:
+        components.append(facebook_service_class)
+    return components
+
+
+def start_background_workers():
+    """starts this process's threads: log and metrics writers, micro-batcher, model watcher,
+    feedback trainer, warm-up
+
+    start_backend.py --production imports the app once before forking and calls
+    this in every worker, since threads don't survive fork()
+    """
+    start_log_listener()
+    # with METRICS_MULTIPROC_DIR, /metrics adds up every worker's snapshot
+    start_metrics_writer(forked=os.getenv("BACKEND_PRELOAD") == "1")
+
+    if "phishing" in ENABLED_FEATURES:
+        if phishing_batcher is not None:
+            phishing_batcher.start()
+        # picks up newly published versions without a restart; it idles until the
+        # warm-up mode has loaded the first version
+        model_registry.start_watcher()
+        feedback_trainer.start()
+
+    if BACKEND_WARMUP == "background":
+        warm_up_in_background(component for component in enabled_components() if not component.loaded)
+
+
+if BACKEND_WARMUP == "eager":
+    for component in enabled_components():
+        try:
+            component.get()
+        except Exception as e:
+            # the feature retries on its first request instead of taking the app down
+            print(f"[WARNING] Loading {component.name} failed: {str(e)}")
+
+if os.getenv("BACKEND_PRELOAD") != "1":
+    start_background_workers()
+
+startup_profiler.mark_ready()
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv:
+        # loads whatever the warm-up mode deferred so its first-use cost shows too
+        for component in enabled_components():
+            component.get()
+        print(f"\n[INFO] Features: {', '.join(sorted(ENABLED_FEATURES))} (warm-up: {BACKEND_WARMUP})")
+        startup_profiler.print_report()
+        sys.exit(0)
+
     print("\n" + "=" * 70)
     print("  UNIFIED SECURITY TOOLS BACKEND")
     print("=" * 70)
@@ -324,8 +741,12 @@ if __name__ == "__main__":
     print("-" * 70)
     
     # Phishing detection
-    if phishing_model and vectorizer:
-        print("[OK] Phishing Detection: READY")
+    if "phishing" not in ENABLED_FEATURES:
+        print("[INFO] Phishing Detection: DISABLED")
+    elif not phishing_model_loader.loaded:
+        print(f"[INFO] Phishing Detection: model loads {'in background' if BACKEND_WARMUP == 'background' else 'on first request'}")
+    elif model_registry.current is not None:
+        print(f"[OK] Phishing Detection: READY (model {model_registry.current.version})")
     else:
         print("[ERROR] Phishing Detection: MODEL NOT LOADED")
         print("   Run 'python train_model.py' to train the model")
@@ -345,7 +766,13 @@ if __name__ == "__main__":
     print("   Frontend should connect to: http://localhost:5000")
     print("\n[INFO] Available endpoints:")
     print("   - GET  /health")
+    print("   - GET  /metrics")
     print("   - POST /phishing/predict")
+    print("   - POST /phishing/predict_batch")
+    print("   - GET  /phishing/cache")
+    print("   - GET  /phishing/model")
+    print("   - POST /phishing/feedback")
+    print("   - POST /phishing/report")
     print("   - GET  /instagram/validate")
     print("   - POST /instagram/analyze")
     print("   - GET  /facebook/validate")
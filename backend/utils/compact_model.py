@@ -0,0 +1,231 @@
+"""
+compact, pickle-free phishing model format
+
+one file holds a small JSON header followed by raw, aligned numpy arrays:
+  terms             sorted fixed-width utf-8 string table (tfidf mode only)
+  columns           feature column for each entry of the term table (tfidf mode only)
+  idf               inverse document frequencies
+  feature_log_prob  naive bayes log P(term | class), shape (classes, features)
+  class_log_prior   naive bayes log P(class)
+  classes           class labels
+
+in hashing mode there is no vocabulary: tokens are hashed straight to columns
+and the header carries the hashing settings and stop word list instead
+
+loading memory-maps the file read-only, so every worker shares the same
+pages and nothing is unpickled (no code runs on load)
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.feature_hashing import hash_columns
+
+MAGIC = b"SMPM"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# vectorizer settings that matter once the vocabulary is fixed
+TOKENIZER_PARAMS = ("lowercase", "token_pattern", "strip_accents")
+TFIDF_PARAMS = ("norm", "use_idf", "sublinear_tf")
+
+
+def _split_vectorizer(vectorizer):
+    """returns (feature_mode, tokenizing step, tf-idf step) for a supported vectorizer"""
+    if hasattr(vectorizer, "steps"):
+        # hashing mode: HashingVectorizer -> TfidfTransformer pipeline
+        hasher, tfidf = vectorizer.steps[0][1], vectorizer.steps[-1][1]
+        if len(vectorizer.steps) != 2 or not hasattr(hasher, "n_features"):
+            raise ValueError("Compact format expects a HashingVectorizer + TfidfTransformer pipeline")
+        if hasher.alternate_sign or hasher.norm is not None or hasher.binary:
+            raise ValueError("Hashing mode needs alternate_sign=False, norm=None and binary=False")
+        return "hashing", hasher, tfidf
+    return "tfidf", vectorizer, vectorizer
+
+
+def _check_supported(tokenizer):
+    """the compact format only covers plain word-unigram features"""
+    if tokenizer.analyzer != "word" or tuple(tokenizer.ngram_range) != (1, 1):
+        raise ValueError("Compact format supports word unigrams only")
+    if tokenizer.tokenizer is not None or tokenizer.preprocessor is not None:
+        raise ValueError("Compact format does not support custom tokenizers/preprocessors")
+    if callable(tokenizer.strip_accents):
+        raise ValueError("Compact format does not support callable strip_accents")
+
+
+def _get_idf(vectorizer) -> np.ndarray:
+    """reads idf_, including from vectorizers pickled by older sklearn (idf diagonal matrix)"""
+    try:
+        return np.asarray(vectorizer.idf_)
+    except AttributeError:
+        return np.asarray(vectorizer._tfidf._idf_diag.diagonal())
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def export_compact_model(model, vectorizer, path: str, dtype: str = "float32",
+                         metadata: Optional[Dict] = None) -> str:
+    """writes a fitted vectorizer + MultinomialNB pair to the compact format
+
+    the vectorizer is either a TfidfVectorizer or a HashingVectorizer +
+    TfidfTransformer pipeline (hashing mode)
+    """
+    feature_mode, tokenizer, tfidf = _split_vectorizer(vectorizer)
+    _check_supported(tokenizer)
+
+    arrays = {}
+    if feature_mode == "tfidf":
+        # byte order sort so the table works with np.searchsorted on utf-8 bytes
+        encoded = sorted((term.encode("utf-8"), column) for term, column in vectorizer.vocabulary_.items())
+        width = max(len(term) for term, _ in encoded)
+        arrays["terms"] = np.array([term for term, _ in encoded], dtype=f"S{width}")
+        arrays["columns"] = np.array([column for _, column in encoded], dtype=np.int32)
+
+    arrays["idf"] = _get_idf(tfidf).astype(dtype)
+    arrays["feature_log_prob"] = np.ascontiguousarray(model.feature_log_prob_, dtype=dtype)
+    arrays["class_log_prior"] = np.asarray(model.class_log_prior_, dtype=dtype)
+    arrays["classes"] = np.asarray(model.classes_, dtype=np.int64)
+
+    params = {name: getattr(tokenizer, name) for name in TOKENIZER_PARAMS}
+    params.update({name: getattr(tfidf, name) for name in TFIDF_PARAMS})
+
+    header = {
+        "formatVersion": FORMAT_VERSION,
+        "createdAt": time.time(),
+        "featureMode": feature_mode,
+        "nFeatures": int(arrays["idf"].shape[0]),
+        "vectorizer": params,
+        "metadata": dict(metadata or {}, featureMode=feature_mode),
+        "arrays": {}
+    }
+
+    if feature_mode == "hashing":
+        # stop words can't be baked into a vocabulary, so serving filters them itself
+        stop_words = tokenizer.get_stop_words()
+        header["hashing"] = {"stopWords": sorted(stop_words) if stop_words else []}
+
+    # lays the arrays out after the header, each on an aligned offset
+    header_size = _align(len(MAGIC) + 4 + 32768)
+    offset = header_size
+    for name, array in arrays.items():
+        header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    if len(MAGIC) + 4 + len(header_bytes) > header_size:
+        raise ValueError("Compact model header too large")
+
+    # writes to a temp file and swaps it in so readers never see a half-written model
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for name, array in arrays.items():
+            f.seek(header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+class CompactModel:
+    """read-only, memory-mapped view of a compact phishing model"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f"{path} is not a compact phishing model")
+        (header_len,) = struct.unpack("<I", self._mmap[4:8])
+        self.header = json.loads(self._mmap[8:8 + header_len].decode("utf-8"))
+        if self.header.get("formatVersion") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact model version: {self.header.get('formatVersion')}")
+
+        # zero-copy numpy views straight onto the mapped pages
+        for name, spec in self.header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=spec["offset"])
+            setattr(self, name, array.reshape(spec["shape"]))
+
+        self.params = self.header["vectorizer"]
+        self.metadata = self.header.get("metadata", {})
+        self.n_features = self.header["nFeatures"]
+        self.feature_mode = self.header.get("featureMode", "tfidf")
+        self.stop_words = frozenset(self.header.get("hashing", {}).get("stopWords", []))
+        self.term_width = self.terms.dtype.itemsize if self.feature_mode == "tfidf" else 0
+
+    def lookup(self, tokens) -> np.ndarray:
+        """maps tokens to feature columns, -1 for tokens outside the vocabulary"""
+        if len(tokens) == 0:
+            return np.empty(0, dtype=np.int32)
+        if self.feature_mode == "hashing":
+            # stop words are the only tokens hashing mode drops
+            columns = hash_columns(tokens, self.n_features)
+            if self.stop_words:
+                columns[[token in self.stop_words for token in tokens]] = -1
+            return columns
+
+        # tokens wider than the table can't be in it (and would truncate into false hits)
+        encoded = [token.encode("utf-8") for token in tokens]
+        fits = np.array([len(token) <= self.term_width for token in encoded])
+        needles = np.array([token if ok else b"" for token, ok in zip(encoded, fits)], dtype=self.terms.dtype)
+
+        positions = np.searchsorted(self.terms, needles)
+        positions[positions >= len(self.terms)] = 0
+        found = fits & (self.terms[positions] == needles)
+        return np.where(found, self.columns[positions], -1)
+
+    def to_sklearn(self):
+        """rebuilds (model, vectorizer) estimators around the mapped arrays"""
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import make_pipeline
+
+        if self.feature_mode == "hashing":
+            hasher = HashingVectorizer(
+                n_features=self.n_features,
+                alternate_sign=False,
+                norm=None,
+                stop_words=sorted(self.stop_words) or None,
+                **{name: self.params[name] for name in TOKENIZER_PARAMS}
+            )
+            tfidf = TfidfTransformer(**{name: self.params[name] for name in TFIDF_PARAMS})
+            tfidf.idf_ = self.idf
+            tfidf.n_features_in_ = self.n_features
+            vectorizer = make_pipeline(hasher, tfidf)
+        else:
+            vocabulary = {term.decode("utf-8"): int(column) for term, column in zip(self.terms, self.columns)}
+            vectorizer = TfidfVectorizer(vocabulary=vocabulary, **self.params)
+            vectorizer.idf_ = self.idf
+
+        model = MultinomialNB()
+        model.classes_ = self.classes
+        model.feature_log_prob_ = self.feature_log_prob
+        model.class_log_prior_ = self.class_log_prior
+        model.n_features_in_ = self.n_features
+        return model, vectorizer
+
+
+def load_compact_model(path: str) -> CompactModel:
+    return CompactModel(path)
+
+
+if __name__ == "__main__":
+    # python -m utils.compact_model - converts the pickled artifacts into the compact format
+    import joblib
+
+    models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+    model = joblib.load(os.path.join(models_dir, "phishing_model.pkl"))
+    vectorizer = joblib.load(os.path.join(models_dir, "vectorizer.pkl"))
+    output = export_compact_model(model, vectorizer, os.path.join(models_dir, "phishing_model.smodel"))
+    print(f"Compact model written to {output}")
@@ -0,0 +1,88 @@
+"""
+token-level explanations for naive bayes phishing predictions
+
+a token's weight is its tf-idf value times how much more likely it is under
+the predicted class than under the others (feature_log_prob_ difference).
+only the non-zero entries of each sparse row are touched - no dense
+vocabulary-sized vectors - and columns are mapped back to tokens from the
+email's own tokens, which also works for hashed features
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from utils.fast_inference import NumpyTfidfVectorizer, SparseFeatures
+from utils.feature_hashing import hash_columns
+
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 50
+
+
+def _sparse_entries(features):
+    """(rows, columns, values) of either the numpy or the scipy feature matrix"""
+    if isinstance(features, SparseFeatures):
+        return features.rows, features.columns, features.values
+    coo = features.tocoo()
+    return coo.row, coo.col, coo.data
+
+
+def _column_tokens(vectorizer, text: str) -> Dict[int, str]:
+    """maps the feature columns of one email back to the tokens that produced them"""
+    if isinstance(vectorizer, NumpyTfidfVectorizer):
+        tokens = list(dict.fromkeys(vectorizer.tokenize(text)))
+        columns = vectorizer.compact.lookup(tokens)
+    elif hasattr(vectorizer, "steps"):
+        # hashing pipeline - re-hash the email's tokens, stop words never get a column
+        hasher = vectorizer.steps[0][1]
+        tokens = list(dict.fromkeys(hasher.build_analyzer()(text)))
+        columns = hash_columns(tokens, hasher.n_features)
+    else:
+        tokens = list(dict.fromkeys(vectorizer.build_analyzer()(text)))
+        columns = [vectorizer.vocabulary_.get(token, -1) for token in tokens]
+
+    mapping = {}
+    for token, column in zip(tokens, columns):
+        if column >= 0:
+            # hash collisions share a column
+            mapping[int(column)] = f"{mapping[int(column)]}/{token}" if int(column) in mapping else token
+    return mapping
+
+
+def explain_predictions(model, vectorizer, texts: List[str], features, predicted: np.ndarray,
+                        top_k: int = DEFAULT_TOP_K) -> List[List[Dict]]:
+    """top tokens pushing each email towards its predicted class index"""
+    if not hasattr(model, "feature_log_prob_"):
+        raise ValueError("Explanations need a naive bayes model")
+
+    feature_log_prob = model.feature_log_prob_
+    rows, columns, values = _sparse_entries(features)
+    rows = np.asarray(rows)
+    columns = np.asarray(columns)
+    values = np.asarray(values)
+
+    # log-likelihood margin of each non-zero entry for its row's predicted class;
+    # only the gathered columns are cast, the (possibly mapped float32) table stays as is
+    entry_log_prob = feature_log_prob[:, columns].astype(np.float64)
+    own = entry_log_prob[predicted[rows], np.arange(len(columns))]
+    n_classes = feature_log_prob.shape[0]
+    others = (entry_log_prob.sum(axis=0) - own) / max(n_classes - 1, 1)
+    weights = values * (own - others)
+
+    # entries are sorted by row in both matrix types, so each row is one slice
+    bounds = np.searchsorted(rows, np.arange(len(texts) + 1))
+    explanations = []
+    for row, text in enumerate(texts):
+        start, end = bounds[row], bounds[row + 1]
+        order = start + np.argsort(-weights[start:end], kind="stable")
+        tokens = _column_tokens(vectorizer, text)
+        explanation = []
+        for entry in order:
+            if len(explanation) >= top_k or weights[entry] <= 0:
+                break
+            explanation.append({
+                "token": tokens.get(int(columns[entry]), f"#{int(columns[entry])}"),
+                "weight": round(float(weights[entry]), 4)
+            })
+        explanations.append(explanation)
+    return explanations
@@ -0,0 +1,193 @@
+"""
+numpy-only phishing inference
+
+reproduces TfidfVectorizer(sublinear_tf=True, ...) + MultinomialNB (or the
+hashing + TfidfTransformer variant) on top of a compact model file, so
+serving needs neither sklearn, scipy nor pandas.
+the estimators mirror the sklearn calls the app uses (transform, predict,
+predict_proba, classes_) so they drop in where the sklearn pair was used
+"""
+
+import re
+import unicodedata
+from typing import List
+
+import numpy as np
+
+from utils.compact_model import CompactModel, load_compact_model
+
+
+def _strip_accents_unicode(text: str) -> str:
+    normalized = unicodedata.normalize("NFKD", text)
+    if normalized == text:
+        return text
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+
+
+class SparseFeatures:
+    """tf-idf rows in coordinate form, entries sorted by (row, column) like CSR"""
+
+    __slots__ = ("rows", "columns", "values", "shape")
+
+    def __init__(self, rows: np.ndarray, columns: np.ndarray, values: np.ndarray, shape):
+        self.rows = rows
+        self.columns = columns
+        self.values = values
+        self.shape = shape
+
+
+class NumpyTfidfVectorizer:
+    """transform-only TF-IDF vectorizer backed by a compact model"""
+
+    def __init__(self, compact: CompactModel):
+        params = compact.params
+        self.compact = compact
+        self.lowercase = params["lowercase"]
+        self.sublinear_tf = params["sublinear_tf"]
+        self.use_idf = params["use_idf"]
+        self.norm = params["norm"]
+        self.token_pattern = re.compile(params["token_pattern"])
+        self.strip_accents = {
+            "unicode": _strip_accents_unicode,
+            "ascii": _strip_accents_ascii
+        }.get(params["strip_accents"])
+        # the mapped float32 array itself, shared by every worker; rows cast what they gather
+        self.idf = compact.idf
+
+    def tokenize(self, text: str) -> List[str]:
+        """same preprocessing order as sklearn: lowercase, strip accents, regex tokens"""
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents is not None:
+            text = self.strip_accents(text)
+        return self.token_pattern.findall(text)
+
+    def transform(self, texts: List[str]) -> SparseFeatures:
+        n_docs = len(texts)
+        n_features = self.compact.n_features
+
+        # one vocabulary lookup per distinct token in the batch
+        token_lists = [self.tokenize(text) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=n_docs)
+        distinct = {}
+        token_ids = [distinct.setdefault(token, len(distinct)) for tokens in token_lists for token in tokens]
+        columns = self.compact.lookup(list(distinct)).astype(np.int64)[np.array(token_ids, dtype=np.int64)]
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+
+        known = columns >= 0
+        keys = rows[known] * n_features + columns[known]
+
+        # counts per (row, column), sorted the way CSR stores them
+        keys, counts = np.unique(keys, return_counts=True)
+        rows = keys // n_features
+        columns = keys % n_features
+        values = counts.astype(np.float64)
+
+        if self.sublinear_tf:
+            np.log(values, values)
+            values += 1
+        if self.use_idf:
+            # float32 -> float64 is exact, so this matches sklearn's upcast bit for bit
+            values *= self.idf[columns].astype(np.float64)
+
+        if self.norm == "l2":
+            norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_docs))
+            norms[norms == 0.0] = 1.0
+            values /= norms[rows]
+        elif self.norm == "l1":
+            norms = np.bincount(rows, weights=np.abs(values), minlength=n_docs)
+            norms[norms == 0.0] = 1.0
+            values /= norms[rows]
+
+        return SparseFeatures(rows, columns, values, (n_docs, n_features))
+
+
+class NumpyMultinomialNB:
+    """predict-only multinomial naive bayes backed by a compact model"""
+
+    def __init__(self, compact: CompactModel):
+        self.classes_ = np.asarray(compact.classes)
+        # kept mapped (float32, shared across workers) - a float64 copy would be private per process
+        self.feature_log_prob_ = compact.feature_log_prob
+        self.class_log_prior_ = np.asarray(compact.class_log_prior, dtype=np.float64)
+
+    def joint_log_likelihood(self, features: SparseFeatures) -> np.ndarray:
+        """sparse dot product with the log probabilities, no dense feature rows"""
+        n_docs = features.shape[0]
+        log_prob = self.feature_log_prob_[:, features.columns].astype(np.float64)
+        contributions = features.values[:, None] * log_prob.T
+        jll = np.column_stack([
+            np.bincount(features.rows, weights=contributions[:, index], minlength=n_docs)
+            for index in range(len(self.classes_))
+        ])
+        return jll + self.class_log_prior_
+
+    def predict_log_proba(self, features: SparseFeatures) -> np.ndarray:
+        jll = self.joint_log_likelihood(features)
+
+        # logsumexp over classes, computed the way scipy >= 1.15 does it
+        # (max terms split out and log1p used) so results match sklearn exactly
+        peak = jll.max(axis=1, keepdims=True)
+        is_peak = jll == peak
+        n_peaks = is_peak.sum(axis=1, keepdims=True).astype(np.float64)
+        rest = np.sum(np.exp(np.where(is_peak, -np.inf, jll) - peak), axis=1, keepdims=True)
+        rest = np.where(rest == 0, rest, rest / n_peaks)
+        log_norm = np.log1p(rest) + np.log(n_peaks) + peak
+        return jll - log_norm
+
+    def predict_proba(self, features: SparseFeatures) -> np.ndarray:
+        return np.exp(self.predict_log_proba(features))
+
+    def predict(self, features: SparseFeatures) -> np.ndarray:
+        return self.classes_[self.joint_log_likelihood(features).argmax(axis=1)]
+
+
+def load_numpy_estimators(path: str):
+    """loads (model, vectorizer) numpy estimators from a compact model file"""
+    compact = load_compact_model(path)
+    return NumpyMultinomialNB(compact), NumpyTfidfVectorizer(compact)
+
+
+def verify_against_sklearn(path: str, texts: List[str]) -> dict:
+    """compares numpy and sklearn outputs for the same compact model"""
+    compact = load_compact_model(path)
+    sk_model, sk_vectorizer = compact.to_sklearn()
+    np_model, np_vectorizer = NumpyMultinomialNB(compact), NumpyTfidfVectorizer(compact)
+
+    expected = sk_model.predict_proba(sk_vectorizer.transform(texts))
+    actual = np_model.predict_proba(np_vectorizer.transform(texts))
+
+    return {
+        "documents": len(texts),
+        "labelsMatch": bool(np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1))),
+        "bitIdentical": bool(np.array_equal(expected, actual)),
+        "maxAbsDiff": float(np.abs(expected - actual).max()) if len(texts) else 0.0
+    }
+
+
+if __name__ == "__main__":
+    # python -m utils.fast_inference [data.csv [column]] - checks numpy vs sklearn outputs
+    import os
+    import sys
+
+    models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+    model_path = os.path.join(models_dir, "phishing_model.smodel")
+
+    if len(sys.argv) > 1:
+        import pandas as pd
+        frame = pd.read_csv(sys.argv[1])
+        column = sys.argv[2] if len(sys.argv) > 2 else "text"
+        samples = frame[column].dropna().astype(str).tolist()
+    else:
+        samples = [
+            "YOU WON A FREE LAMBO, CLICK NOW TO CLAIM.",
+            "Hi team, the meeting moved to 3pm. Agenda attached.",
+            "Your account has been suspended, verify your password here",
+            ""
+        ]
+
+    print(verify_against_sklearn(model_path, samples))
@@ -0,0 +1,86 @@
+"""
+pure python feature hashing, matching sklearn's HashingVectorizer
+
+lets the numpy serving path hash tokens to columns without importing sklearn.
+sklearn's C murmurhash is used when it is installed, and columns are memoized
+per token since email vocabulary repeats a lot
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+try:
+    from sklearn.utils import murmurhash3_32 as _c_murmurhash3_32
+except ImportError:
+    _c_murmurhash3_32 = None
+
+_MASK = 0xffffffff
+# tokens remembered per (n_features, seed); the memo starts over once it is full
+MAX_MEMO_TOKENS = 200000
+
+_column_memo: Dict[Tuple[int, int], Dict[str, int]] = {}
+
+
+def _rotl32(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (32 - shift))) & _MASK
+
+
+def murmurhash3_32(data: bytes, seed: int = 0) -> int:
+    """signed 32-bit MurmurHash3 (x86_32), same as sklearn.utils.murmurhash3_32"""
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    length = len(data)
+    h = seed & _MASK
+    rounded = length & ~3
+
+    for i in range(0, rounded, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = _rotl32((k * c1) & _MASK, 15)
+        h ^= (k * c2) & _MASK
+        h = (_rotl32(h, 13) * 5 + 0xe6546b64) & _MASK
+
+    tail = length & 3
+    if tail:
+        k = 0
+        if tail == 3:
+            k ^= data[rounded + 2] << 16
+        if tail >= 2:
+            k ^= data[rounded + 1] << 8
+        k ^= data[rounded]
+        k = _rotl32((k * c1) & _MASK, 15)
+        h ^= (k * c2) & _MASK
+
+    # final avalanche
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & _MASK
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & _MASK
+    h ^= h >> 16
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def _hash_column(token: str, n_features: int, seed: int) -> int:
+    if _c_murmurhash3_32 is not None:
+        h = int(_c_murmurhash3_32(token, seed))
+    else:
+        h = murmurhash3_32(token.encode("utf-8"), seed)
+    # abs() of the most negative int32 overflows in sklearn's cython code
+    if h == -2147483648:
+        return (2147483647 - (n_features - 1)) % n_features
+    return abs(h) % n_features
+
+
+def hash_columns(tokens: List[str], n_features: int, seed: int = 0) -> np.ndarray:
+    """maps tokens to hashed feature columns the way sklearn's FeatureHasher does"""
+    memo = _column_memo.setdefault((n_features, seed), {})
+    columns = np.empty(len(tokens), dtype=np.int64)
+    for position, token in enumerate(tokens):
+        column = memo.get(token)
+        if column is None:
+            column = _hash_column(token, n_features, seed)
+            if len(memo) >= MAX_MEMO_TOKENS:
+                memo.clear()
+            memo[token] = column
+        columns[position] = column
+    return columns
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+
+class MicroBatcher:
+    """groups concurrent single-item calls into one batched handler call
+
+    request threads call submit() and block on the result, while one
+    background thread drains the queue into batches of up to max_batch_size
+    items, waiting at most max_wait_ms for a batch to fill.
+    threads don't survive fork(), so preforked servers call start() again in
+    each worker
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0, autostart: bool = True):
+        self.handler = handler
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        if autostart:
+            self.start()
+
+    def start(self):
+        """starts the worker thread unless it is already running in this process"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        # a fresh queue - one inherited over fork may have its lock held
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any, timeout: float = 30.0) -> Any:
+        """queues one item and waits for its result"""
+        future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout=timeout)
+
+    def _collect_batch(self) -> List:
+        """blocks for the first item, then gathers more until full or out of time"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # out of wait time - still take anything already queued
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """worker loop - runs the handler once per batch and fans results back out"""
+        while True:
+            batch = self._collect_batch()
+            items = [item for item, _ in batch]
+
+            try:
+                results = self.handler(items)
+                if len(results) != len(items):
+                    raise RuntimeError("Batch handler returned the wrong number of results")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
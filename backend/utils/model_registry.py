@@ -0,0 +1,259 @@
+"""
+versioned phishing model registry with atomic hot-swap
+
+layout under models/registry/:
+  manifest.json                 {"active": "<version>", "versions": {"<version>": {...}}}
+  <version>/phishing_model.smodel
+  <version>/phishing_model.pkl, vectorizer.pkl   trainable state for online updates
+
+without a manifest the registry serves the legacy models/ files and treats
+a change to them as a new version. a new version is loaded and warmed with
+sample inference in the background, then swapped in with a single reference
+assignment, so requests never see a half-loaded model. publishing holds
+registry_lock(), so several processes can publish into the same registry
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - waitress serves from one process, the thread lock covers it
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+COMPACT_NAME = "phishing_model.smodel"
+MODEL_PICKLE_NAME = "phishing_model.pkl"
+VECTORIZER_PICKLE_NAME = "vectorizer.pkl"
+LOCK_NAME = ".lock"
+
+# run through every new model before it takes traffic
+WARMUP_EMAILS = [
+    "Your account has been suspended. Verify your password immediately at the link below.",
+    "Hi team, the project meeting moved to 3pm tomorrow. Agenda attached.",
+    "Congratulations! You won a free gift card, click now to claim your prize."
+]
+
+
+class ActiveModel:
+    """one loaded model version - never mutated after it is published"""
+
+    __slots__ = ("version", "model", "vectorizer", "path", "metadata", "loaded_at")
+
+    def __init__(self, version: str, model, vectorizer, path: str, metadata: Optional[Dict] = None):
+        self.version = version
+        self.model = model
+        self.vectorizer = vectorizer
+        self.path = path
+        self.metadata = metadata or {}
+        self.loaded_at = time.time()
+
+
+def _file_version(path: str) -> str:
+    stat = os.stat(path)
+    return f"file-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _write_json_atomic(path: str, data: Dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+_thread_lock = threading.RLock()
+_lock_depth = threading.local()
+
+
+@contextmanager
+def registry_lock(models_dir: str):
+    """exclusive access to the registry across threads and processes (flock on registry/.lock)
+
+    reentrant within a thread, so a caller holding it can still call publish_model()
+    """
+    registry_dir = os.path.join(models_dir, "registry")
+    with _thread_lock:
+        depth = getattr(_lock_depth, "value", 0)
+        if depth:
+            _lock_depth.value = depth + 1
+            try:
+                yield
+            finally:
+                _lock_depth.value = depth
+            return
+
+        os.makedirs(registry_dir, exist_ok=True)
+        with open(os.path.join(registry_dir, LOCK_NAME), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            _lock_depth.value = 1
+            try:
+                yield
+            finally:
+                _lock_depth.value = 0
+                # closing the file releases the flock
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def publish_model(models_dir: str, model, vectorizer, metadata: Optional[Dict] = None,
+                  version: Optional[str] = None, keep: Optional[int] = None) -> str:
+    """exports a trained model as a new registry version and makes it active
+
+    keep prunes all but the newest `keep` versions afterwards. the whole
+    manifest read-modify-write and the prune run under registry_lock()
+    """
+    with registry_lock(models_dir):
+        return _publish_locked(models_dir, model, vectorizer, metadata, version, keep)
+
+
+def _publish_locked(models_dir: str, model, vectorizer, metadata: Optional[Dict],
+                    version: Optional[str], keep: Optional[int]) -> str:
+    import joblib
+    from utils.compact_model import export_compact_model
+
+    registry_dir = os.path.join(models_dir, "registry")
+    if version is None:
+        version = base = time.strftime("v%Y%m%d-%H%M%S")
+        suffix = 1
+        # several publishes within one second still get distinct versions
+        while os.path.exists(os.path.join(registry_dir, version)):
+            suffix += 1
+            version = f"{base}-{suffix}"
+    version_dir = os.path.join(registry_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    export_compact_model(model, vectorizer, os.path.join(version_dir, COMPACT_NAME),
+                         metadata=dict(metadata or {}, version=version))
+    # the compact file only has log probabilities - partial_fit needs the raw counts
+    joblib.dump(model, os.path.join(version_dir, MODEL_PICKLE_NAME))
+    joblib.dump(vectorizer, os.path.join(version_dir, VECTORIZER_PICKLE_NAME))
+
+    manifest_path = os.path.join(registry_dir, MANIFEST_NAME)
+    manifest = {"active": None, "versions": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    manifest["versions"][version] = {
+        "path": f"{version}/{COMPACT_NAME}",
+        "publishedAt": time.time(),
+        "metadata": metadata or {}
+    }
+    # the manifest is only switched once the model files are fully written
+    manifest["active"] = version
+
+    pruned = []
+    if keep is not None and keep > 0:
+        by_age = sorted(manifest["versions"], key=lambda v: manifest["versions"][v]["publishedAt"])
+        pruned = [v for v in by_age[:-keep] if v != version]
+        for old_version in pruned:
+            del manifest["versions"][old_version]
+
+    _write_json_atomic(manifest_path, manifest)
+
+    # deleted after the manifest stops pointing at them; workers still serving
+    # an old version keep their memory map until they swap
+    for old_version in pruned:
+        shutil.rmtree(os.path.join(registry_dir, old_version), ignore_errors=True)
+    return version
+
+
+class ModelRegistry:
+    """holds the active phishing model and hot-swaps it when a new version appears"""
+
+    def __init__(self, models_dir: str, loader: Callable, legacy_paths=(),
+                 poll_interval: float = 5.0, on_swap: Optional[Callable] = None):
+        self.models_dir = models_dir
+        self.registry_dir = os.path.join(models_dir, "registry")
+        self.manifest_path = os.path.join(self.registry_dir, MANIFEST_NAME)
+        self.loader = loader
+        self.legacy_paths = legacy_paths
+        self.poll_interval = poll_interval
+        self.on_swap = on_swap
+        self.current: Optional[ActiveModel] = None
+        self.last_error: Optional[str] = None
+        # set by the first refresh(); until then the watcher leaves loading to the app's warm-up
+        self.checked = False
+        self._swap_lock = threading.Lock()
+        self._watcher = None
+
+    def resolve_active(self):
+        """finds (version, path, metadata) of the model that should be active"""
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            version = manifest.get("active")
+            if version:
+                entry = manifest["versions"][version]
+                return version, os.path.join(self.registry_dir, entry["path"]), entry.get("metadata", {})
+
+        # no registry yet - fall back to the first legacy file that exists
+        for path in self.legacy_paths:
+            if os.path.exists(path):
+                return _file_version(path), path, {}
+        return None, None, {}
+
+    def _warm(self, model, vectorizer):
+        """runs sample inference so the first real request doesn't pay for lazy init"""
+        probabilities = model.predict_proba(vectorizer.transform(WARMUP_EMAILS))
+        if probabilities.shape[0] != len(WARMUP_EMAILS):
+            raise ValueError("Warm-up inference returned the wrong number of rows")
+
+    def refresh(self) -> bool:
+        """loads, warms and swaps in a new version if one appeared; True if swapped"""
+        with self._swap_lock:
+            self.checked = True
+            version, path, metadata = self.resolve_active()
+            if version is None or (self.current is not None and self.current.version == version):
+                return False
+
+            model, vectorizer = self.loader(path)
+            self._warm(model, vectorizer)
+
+            previous = self.current
+            # single reference assignment - in-flight requests keep the model they grabbed
+            self.current = ActiveModel(version, model, vectorizer, path, metadata)
+            self.last_error = None
+
+        if self.on_swap is not None:
+            self.on_swap(self.current)
+        if previous is not None:
+            print(f"[OK] Phishing model hot-swapped {previous.version} -> {version}")
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if not self.checked:
+                # lazy warm-up hasn't loaded a first version yet - don't load it early
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                # keep serving the old version if the new one fails to load or warm up
+                self.last_error = str(e)
+                print(f"[WARNING] Phishing model refresh failed: {str(e)}")
+
+    def start_watcher(self):
+        """polls for new versions in a background thread - after fork, never in a preloading master"""
+        # a watcher inherited over fork is no longer running in this process
+        if (self._watcher is None or not self._watcher.is_alive()) and self.poll_interval > 0:
+            self._watcher = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._watcher.start()
+
+    def status(self) -> Dict:
+        active = self.current
+        return {
+            "activeVersion": active.version if active else None,
+            "path": os.path.relpath(active.path, self.models_dir) if active else None,
+            "loadedAt": active.loaded_at if active else None,
+            "metadata": active.metadata if active else {},
+            "registry": os.path.exists(self.manifest_path),
+            "lastError": self.last_error
+        }
@@ -0,0 +1,229 @@
+"""
+online updates of the phishing model from analyst feedback
+
+labeled emails are buffered and periodically applied with partial_fit to a
+shadow copy of the sklearn MultinomialNB behind the active model version.
+the updated shadow is published as a new registry version and swapped in
+through the model registry, so workers pick it up without a restart.
+each worker buffers the feedback it received; an update holds the registry
+lock and builds on the newest published version, so updates from several
+workers queue up instead of overwriting each other.
+labels from end users are never trained on directly: UnverifiedFeedbackLog
+keeps them on disk until an analyst has reviewed them
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from utils.model_registry import (
+    MODEL_PICKLE_NAME, VECTORIZER_PICKLE_NAME, ModelRegistry, publish_model, registry_lock
+)
+
+LABELS = {"legit": 0, "phishing": 1}
+
+
+def parse_label(value) -> int:
+    """accepts "phishing"/"legit" or 1/0"""
+    if isinstance(value, str) and value.lower() in LABELS:
+        return LABELS[value.lower()]
+    if value in (0, 1) and not isinstance(value, bool):
+        return int(value)
+    raise ValueError(f"Invalid label '{value}'. Use one of: phishing, legit, 1, 0")
+
+
+class FeedbackTrainer:
+    """buffers labeled emails and promotes partial_fit updates of a shadow model"""
+
+    def __init__(self, registry: ModelRegistry, models_dir: str, min_batch: int = 20,
+                 interval_secs: float = 60.0, max_buffered: int = 10000, keep_versions: int = 10):
+        self.registry = registry
+        self.models_dir = models_dir
+        self.min_batch = min_batch
+        self.interval_secs = interval_secs
+        self.keep_versions = keep_versions
+        self.applied = 0
+        self.dropped = 0
+        self.last_update_at = None
+        self.last_promoted = None
+        self.last_error = None
+        self._buffer = deque(maxlen=max_buffered)
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._shadow = None
+        self._shadow_version = None
+        self._worker = None
+
+    def add(self, samples: List[Tuple[str, int]]) -> int:
+        """buffers (email, label) pairs, returns how many are waiting"""
+        with self._lock:
+            overflow = len(self._buffer) + len(samples) - self._buffer.maxlen
+            if overflow > 0:
+                # oldest feedback goes first when updates can't keep up
+                self.dropped += overflow
+            self._buffer.extend(samples)
+            return len(self._buffer)
+
+    def _load_shadow(self, version: str, path: str):
+        """loads the trainable sklearn pair that sits next to a model file"""
+        import joblib
+
+        model_dir = os.path.dirname(path)
+        model = joblib.load(os.path.join(model_dir, MODEL_PICKLE_NAME))
+        vectorizer = joblib.load(os.path.join(model_dir, VECTORIZER_PICKLE_NAME))
+        if not hasattr(model, "partial_fit") or not hasattr(model, "feature_count_"):
+            raise ValueError(f"{type(model).__name__} can't be updated incrementally")
+
+        self._shadow = (model, vectorizer)
+        self._shadow_version = version
+
+    def apply_updates(self) -> Optional[str]:
+        """partial_fits the buffered feedback and promotes the result; returns the new version"""
+        with self._update_lock:
+            with self._lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+            if not batch:
+                return None
+
+            try:
+                # other workers (and retrains) publish too - the lock makes this update
+                # start from the newest version and keeps anyone from publishing meanwhile
+                with registry_lock(self.models_dir):
+                    version, path, _ = self.registry.resolve_active()
+                    if version is None:
+                        raise ValueError("No active phishing model to update")
+                    if self._shadow is None or self._shadow_version != version:
+                        self._load_shadow(version, path)
+
+                    model, vectorizer = self._shadow
+                    # the shadow only changes once the promotion succeeded
+                    candidate = copy.deepcopy(model)
+                    texts = [email_text for email_text, _ in batch]
+                    labels = [label for _, label in batch]
+                    candidate.partial_fit(vectorizer.transform(texts), labels, classes=candidate.classes_)
+
+                    version = publish_model(self.models_dir, candidate, vectorizer, metadata={
+                        "trainingMode": "online",
+                        "baseVersion": self._shadow_version,
+                        "feedbackSamples": len(batch),
+                        "totalFeedbackSamples": self.applied + len(batch)
+                    }, keep=self.keep_versions)
+            except Exception as e:
+                # put the feedback back so the next cycle retries it; the batch is older
+                # than anything added meanwhile, so as in add() it's what goes if it won't fit
+                with self._lock:
+                    overflow = len(self._buffer) + len(batch) - self._buffer.maxlen
+                    if overflow > 0:
+                        self.dropped += overflow
+                    self._buffer.extendleft(reversed(batch[max(overflow, 0):]))
+                self.last_error = str(e)
+                raise
+
+            self._shadow = (candidate, vectorizer)
+            self._shadow_version = version
+            self.applied += len(batch)
+            self.last_update_at = time.time()
+            self.last_promoted = version
+            self.last_error = None
+            print(f"[OK] Applied {len(batch)} feedback emails, promoted phishing model {version}")
+
+        # swap this worker now instead of waiting for the registry poll;
+        # if it fails the poll retries and keeps the old version meanwhile
+        try:
+            self.registry.refresh()
+        except Exception as e:
+            self.registry.last_error = str(e)
+            print(f"[WARNING] Phishing model refresh failed: {str(e)}")
+        return version
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_secs)
+            with self._lock:
+                ready = len(self._buffer) >= self.min_batch
+            if ready:
+                try:
+                    self.apply_updates()
+                except Exception as e:
+                    print(f"[WARNING] Online phishing model update failed: {str(e)}")
+
+    def start(self):
+        """applies buffered feedback every interval_secs in a background thread"""
+        if (self._worker is None or not self._worker.is_alive()) and self.interval_secs > 0:
+            self._worker = threading.Thread(target=self._run, name="feedback-trainer", daemon=True)
+            self._worker.start()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "minBatch": self.min_batch,
+            "intervalSecs": self.interval_secs,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "lastUpdateAt": self.last_update_at,
+            "lastPromotedVersion": self.last_promoted,
+            "lastError": self.last_error
+        }
+
+
+class UnverifiedFeedbackLog:
+    """appends end-user labels to a JSON-lines file for offline analyst review
+
+    each entry is written with one O_APPEND write, so several workers can share
+    the file. once it reaches max_bytes further reports are refused, not rotated
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024, max_email_chars: int = 20000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_email_chars = max_email_chars
+        self.recorded = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    def _size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def record(self, samples: List[Tuple[str, int]], model_version: Optional[str] = None) -> bool:
+        """appends (email, label) pairs; False when the log is full"""
+        reported_at = time.time()
+        data = "".join(
+            json.dumps({
+                "email": email_text[:self.max_email_chars],
+                "label": label,
+                "modelVersion": model_version,
+                "reportedAt": reported_at
+            }) + "\n"
+            for email_text, label in samples
+        ).encode("utf-8")
+
+        with self._lock:
+            if self._size() + len(data) > self.max_bytes:
+                self.refused += len(samples)
+                return False
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            self.recorded += len(samples)
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "recorded": self.recorded,
+            "refused": self.refused,
+            "bytes": self._size(),
+            "maxBytes": self.max_bytes
+        }
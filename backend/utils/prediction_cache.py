@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_email_text(text: str) -> str:
+    """collapses case and whitespace - the vectorizer ignores both anyway"""
+    return " ".join(text.lower().split())
+
+
+class PredictionCache:
+    """bounded LRU cache of phishing predictions keyed by text hash + model version
+
+    the model version is whatever set_model_version() was last given (the
+    registry calls it on every hot-swap), and the cache empties itself when it changes
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.model_version = "static"
+
+    def set_model_version(self, version: str):
+        """switches to an explicitly versioned model (e.g. after a registry hot-swap)"""
+        with self._lock:
+            if version != self.model_version:
+                self.model_version = version
+                self._entries.clear()
+                self.invalidations += 1
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_email_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_version}:{digest}"
+
+    def get(self, text: str) -> Optional[Any]:
+        """returns the cached prediction or None, counting the hit/miss"""
+        if self.max_entries <= 0:
+            return None
+
+        with self._lock:
+            key = self._key(text)
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, text: str, result: Any, model_version: Optional[str] = None):
+        """stores a prediction, evicting the least recently used entry when full
+
+        model_version is the version that produced the result - results from a
+        model that was swapped out mid-request are dropped instead of cached
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            key = self._key(text)
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """gets hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "modelVersion": self.model_version
+            }
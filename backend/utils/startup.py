@@ -0,0 +1,127 @@
+"""
+startup budget helpers: feature flags, lazy components and a startup profile
+
+a worker only imports and loads the subsystems it serves, heavy ones on
+first use (or in a background warm-up), and every import/load is timed so
+`python unified_app.py --startup-profile` can show where cold start goes
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+ALL_FEATURES = ("phishing", "instagram", "facebook")
+# eager: load at import, background: warm up in a thread, lazy: load on first request
+WARMUP_MODES = ("eager", "background", "lazy")
+
+
+def parse_features(value: Optional[str]) -> Set[str]:
+    """reads a comma separated feature list, e.g. BACKEND_FEATURES=phishing"""
+    if not value or value.strip().lower() == "all":
+        return set(ALL_FEATURES)
+    features = {name.strip().lower() for name in value.split(",") if name.strip()}
+    unknown = features - set(ALL_FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}. Use: {', '.join(ALL_FEATURES)}")
+    return features
+
+
+def parse_warmup_mode(value: Optional[str]) -> str:
+    mode = (value or "eager").strip().lower()
+    if mode not in WARMUP_MODES:
+        raise ValueError(f"Unknown warm-up mode '{mode}'. Use one of: {', '.join(WARMUP_MODES)}")
+    return mode
+
+
+class StartupProfiler:
+    """records how long each component took to import and load"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_secs = None
+        self._records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, component: str, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._records.append({
+                    "component": component,
+                    "phase": phase,
+                    "secs": round(elapsed, 4),
+                    # first use after the app was ready, not part of cold start
+                    "deferred": self.ready_secs is not None
+                })
+
+    def mark_ready(self):
+        """call once the module is importable and serving could begin"""
+        self.ready_secs = time.perf_counter() - self.started
+
+    def report(self) -> Dict:
+        with self._lock:
+            records = list(self._records)
+        return {
+            "readySecs": round(self.ready_secs, 4) if self.ready_secs is not None else None,
+            "components": records
+        }
+
+    def print_report(self):
+        report = self.report()
+        print("\n[INFO] Startup profile:")
+        print("-" * 70)
+        for record in report["components"]:
+            when = "first use" if record["deferred"] else "startup"
+            print(f"   {record['component']:<22} {record['phase']:<8} {record['secs'] * 1000:>9.1f} ms  ({when})")
+        print("-" * 70)
+        if report["readySecs"] is not None:
+            print(f"   ready to serve after {report['readySecs'] * 1000:.1f} ms")
+
+
+class LazyComponent:
+    """runs an expensive loader once, on first get() or in a background warm-up"""
+
+    def __init__(self, name: str, loader: Callable, profiler: StartupProfiler, phase: str = "load"):
+        self.name = name
+        self.loader = loader
+        self.profiler = profiler
+        self.phase = phase
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            # a failed load isn't remembered, the next call tries again
+            if not self._loaded:
+                with self.profiler.track(self.name, self.phase):
+                    self._value = self.loader()
+                self._loaded = True
+        return self._value
+
+
+def warm_up_in_background(components: Iterable[LazyComponent]) -> threading.Thread:
+    """loads components in a daemon thread so the first request doesn't pay for them"""
+    pending: List[LazyComponent] = list(components)
+
+    def run():
+        for component in pending:
+            try:
+                component.get()
+            except Exception as e:
+                print(f"[WARNING] Warm-up of {component.name} failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name="startup-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,19 +1,60 @@
 import re
-from nltk.corpus import stopwords
-import nltk
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from utils.stopwords import load_stopwords
 
-# Ensure stopwords are available
-nltk.download("stopwords", quiet=True)
+# bundled list - no NLTK download (or network) at import time
+STOPWORDS = load_stopwords(os.getenv("STOPWORDS_SOURCE", "bundled"))
+
+# compiled once instead of on every call
+URL_PATTERN = re.compile(r"http\S+|www\.\S+")
+EMAIL_PATTERN = re.compile(r"\S+@\S+")
+NON_ALNUM_PATTERN = re.compile(r"[^a-zA-Z0-9\s]")
+
+# below this many documents a process pool costs more than it saves
+MIN_PARALLEL_DOCS = 20000
+
+
+def _remove_stopwords(text: str) -> str:
+    return " ".join(w for w in text.split() if w not in STOPWORDS)
 
-STOPWORDS = set(stopwords.words("english"))
 
 def clean_text(text: str) -> str:
     if not isinstance(text, str):
         return ""
     # Remove URLs, emails, and non-alphanumeric characters
-    text = re.sub(r"http\S+|www\.\S+", " ", text)
-    text = re.sub(r"\S+@\S+", " ", text)
-    text = re.sub(r"[^a-zA-Z0-9\s]", " ", text)
+    text = URL_PATTERN.sub(" ", text)
+    text = EMAIL_PATTERN.sub(" ", text)
+    text = NON_ALNUM_PATTERN.sub(" ", text)
     text = text.lower()
-    words = [w for w in text.split() if w not in STOPWORDS]
-    return " ".join(words)
+    return _remove_stopwords(text)
+
+
+def _clean_series(texts: pd.Series) -> pd.Series:
+    """vectorized clean_text over a whole series"""
+    texts = texts.where(texts.map(lambda t: isinstance(t, str)), "")
+    texts = texts.str.replace(URL_PATTERN, " ", regex=True)
+    texts = texts.str.replace(EMAIL_PATTERN, " ", regex=True)
+    texts = texts.str.replace(NON_ALNUM_PATTERN, " ", regex=True)
+    return texts.str.lower().map(_remove_stopwords)
+
+
+def _clean_chunk(texts: list) -> list:
+    return _clean_series(pd.Series(texts, dtype=object)).tolist()
+
+
+def clean_texts(texts, n_jobs: int = 1, chunk_size: int = 10000) -> pd.Series:
+    """bulk clean_text: pandas string ops, optionally fanned out over processes"""
+    series = pd.Series(texts, dtype=object)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs <= 1 or len(series) < MIN_PARALLEL_DOCS:
+        return _clean_series(series)
+
+    values = series.tolist()
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        cleaned = [text for chunk in executor.map(_clean_chunk, chunks) for text in chunk]
+    return pd.Series(cleaned, index=series.index, dtype=object)
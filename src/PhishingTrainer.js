@@ -13,6 +13,7 @@ const PhishingTrainer = () => {
   const [result, setResult] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [feedbackStatus, setFeedbackStatus] = useState('');
 
   const analyzeEmail = async () => {
     if (!emailText.trim()) {
@@ -23,6 +24,7 @@ const PhishingTrainer = () => {
     setLoading(true);
     setError('');
     setResult(null);
+    setFeedbackStatus('');
 
     try {
       const response = await axios.post('http://localhost:5000/predict', {
@@ -38,10 +40,27 @@ const PhishingTrainer = () => {
     }
   };
 
+  // end-user labels are only recorded for analyst review - they never retrain the model directly
+  const sendFeedback = async (label) => {
+    setFeedbackStatus('sending');
+
+    try {
+      await axios.post('http://localhost:5000/phishing/report', {
+        email: emailText,
+        label: label
+      });
+      setFeedbackStatus('sent');
+    } catch (err) {
+      console.error('Error sending feedback:', err);
+      setFeedbackStatus('failed');
+    }
+  };
+
   const clearAnalysis = () => {
     setEmailText('');
     setResult(null);
     setError('');
+    setFeedbackStatus('');
   };
 
   const getResultColor = (label) => {
@@ -150,6 +169,31 @@ const PhishingTrainer = () => {
                   <p><strong>Confidence Score:</strong> {result.prediction}</p>
                 </div>
 
+                <div className="feedback-section">
+                  <h4>Was this correct?</h4>
+                  {feedbackStatus === 'sent' ? (
+                    <p>✅ Thanks! Your label was recorded for review.</p>
+                  ) : (
+                    <div className="button-group">
+                      <button
+                        onClick={() => sendFeedback('phishing')}
+                        disabled={feedbackStatus === 'sending'}
+                      >
+                        It's Phishing
+                      </button>
+                      <button
+                        onClick={() => sendFeedback('legit')}
+                        disabled={feedbackStatus === 'sending'}
+                      >
+                        It's Legit
+                      </button>
+                    </div>
+                  )}
+                  {feedbackStatus === 'failed' && (
+                    <p>❌ Failed to send feedback. Make sure the backend server is running.</p>
+                  )}
+                </div>
+
                 {result.label === 'phishing' && (
                   <div className="warning-tips">
                     <h4>⚠️ Red Flags to Watch For:</h4>
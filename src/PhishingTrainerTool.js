@@ -18,6 +18,7 @@ function PhishingTrainerTool() {
   const [result, setResult] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [feedbackStatus, setFeedbackStatus] = useState('');
   const [isLoading, setIsLoading] = useState(true);
 
   React.useEffect(() => {
@@ -42,6 +43,7 @@ function PhishingTrainerTool() {
     setLoading(true);
     setError('');
     setResult(null);
+    setFeedbackStatus('');
 
     try {
       const response = await axios.post('http://localhost:5000/predict', {
@@ -57,10 +59,27 @@ function PhishingTrainerTool() {
     }
   };
 
+  // end-user labels are only recorded for analyst review - they never retrain the model directly
+  const sendFeedback = async (label) => {
+    setFeedbackStatus('sending');
+
+    try {
+      await axios.post('http://localhost:5000/phishing/report', {
+        email: emailText,
+        label: label
+      });
+      setFeedbackStatus('sent');
+    } catch (err) {
+      console.error('Error sending feedback:', err);
+      setFeedbackStatus('failed');
+    }
+  };
+
   const clearAnalysis = () => {
     setEmailText('');
     setResult(null);
     setError('');
+    setFeedbackStatus('');
   };
 
   const getResultColor = (label) => {
@@ -197,6 +216,40 @@ function PhishingTrainerTool() {
                   </div>
                 </div>
 
+                {/* Feedback Section */}
+                <div className="bg-black/40 backdrop-blur-md border border-cyan-500/30 rounded-lg p-6 text-center">
+                  <h4 className="text-cyan-400 font-mono font-bold mb-4" style={{ fontSize: '1.2rem' }}>
+                    &nbsp;&nbsp;WAS&nbsp;THIS&nbsp;CORRECT?&nbsp;&nbsp;
+                  </h4>
+                  {feedbackStatus === 'sent' ? (
+                    <p className="text-green-300 font-mono">
+                      Thanks! Your label was recorded for review.
+                    </p>
+                  ) : (
+                    <div className="flex space-x-4 justify-center">
+                      <button
+                        onClick={() => sendFeedback('phishing')}
+                        disabled={feedbackStatus === 'sending'}
+                        className="px-6 py-2 bg-transparent border border-red-500 text-red-400 font-mono font-bold rounded-md disabled:opacity-50 disabled:cursor-not-allowed"
+                      >
+                        IT'S PHISHING
+                      </button>
+                      <button
+                        onClick={() => sendFeedback('legit')}
+                        disabled={feedbackStatus === 'sending'}
+                        className="px-6 py-2 bg-transparent border border-green-500 text-green-400 font-mono font-bold rounded-md disabled:opacity-50 disabled:cursor-not-allowed"
+                      >
+                        IT'S LEGIT
+                      </button>
+                    </div>
+                  )}
+                  {feedbackStatus === 'failed' && (
+                    <p className="text-red-300 font-mono mt-3">
+                      Failed to send feedback. Make sure the backend server is running.
+                    </p>
+                  )}
+                </div>
+
                 {/* Tips Section */}
                 {result.label === 'phishing' && (
                   <div className="bg-red-900/20 backdrop-blur-md border border-red-500/30 rounded-lg p-6">
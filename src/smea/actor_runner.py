@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+try:
+    from .circuit_breaker import CircuitBreaker, CircuitOpenError, retry_with_backoff
+    from .metrics import NETWORK_BUCKETS, counter, histogram
+except ImportError:
+    from circuit_breaker import CircuitBreaker, CircuitOpenError, retry_with_backoff
+    from metrics import NETWORK_BUCKETS, counter, histogram
+
+if TYPE_CHECKING:
+    # only for annotations - importing apify_client is deferred to the services
+    from apify_client import ApifyClient
+
+# run states where the actor will not add any more dataset items
+FINISHED_STATUSES = {'SUCCEEDED', 'FAILED', 'ABORTED', 'TIMED-OUT'}
+
+# seconds of the overall request budget kept back for scanning and scoring
+ANALYSIS_RESERVE_SECS = 2.0
+
+ACTOR_CALL_SECONDS = histogram(
+    'smea_actor_call_seconds', 'Apify actor start and wait time', ('actor',), NETWORK_BUCKETS
+)
+DATASET_FETCH_SECONDS = histogram(
+    'smea_dataset_fetch_seconds', 'Apify dataset read time', ('actor',), NETWORK_BUCKETS
+)
+ACTOR_FAST_FAILURES = counter(
+    'smea_actor_circuit_rejections_total', 'Actor calls failed fast by an open circuit', ('actor',)
+)
+DATASET_READ_RETRIES = counter('smea_dataset_read_retries_total', 'Retried Apify dataset reads', ('actor',))
+SNAPSHOT_FALLBACKS = counter(
+    'smea_actor_snapshot_fallbacks_total', 'Failed actor calls answered from the last snapshot', ('actor',)
+)
+
+# consecutive failed or timed-out runs before an actor's circuit opens, and how long it stays open
+BREAKER_FAILURES = int(os.getenv('ACTOR_BREAKER_FAILURES', '3'))
+BREAKER_RESET_SECS = float(os.getenv('ACTOR_BREAKER_RESET_SECS', '60'))
+DATASET_READ_ATTEMPTS = int(os.getenv('DATASET_READ_ATTEMPTS', '3'))
+# ACTOR_SNAPSHOT_FALLBACK=1 answers a failed run with the last result for the same input
+SNAPSHOT_FALLBACK = os.getenv('ACTOR_SNAPSHOT_FALLBACK') == '1'
+SNAPSHOT_MAX_ENTRIES = int(os.getenv('ACTOR_SNAPSHOT_MAX_ENTRIES', '200'))
+SNAPSHOT_MAX_AGE_SECS = float(os.getenv('ACTOR_SNAPSHOT_MAX_AGE_SECS', '86400'))
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(actor_id: str) -> CircuitBreaker:
+    """the circuit breaker shared by every run of one actor"""
+    with _breakers_lock:
+        breaker = _breakers.get(actor_id)
+        if breaker is None:
+            breaker = _breakers[actor_id] = CircuitBreaker(
+                f'Apify actor {actor_id}', BREAKER_FAILURES, BREAKER_RESET_SECS
+            )
+        return breaker
+
+
+class SnapshotCache:
+    """last successful items per (actor, input), least recently used evicted first"""
+
+    def __init__(self, max_entries: int = SNAPSHOT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[List[Dict], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(actor_id: str, run_input: Dict) -> str:
+        return actor_id + ':' + json.dumps(run_input, sort_keys=True)
+
+    def get(self, key: str, max_age_secs: float = SNAPSHOT_MAX_AGE_SECS) -> Optional[Tuple[List[Dict], float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > max_age_secs:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, items: List[Dict]):
+        with self._lock:
+            self._entries[key] = (items, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+snapshot_cache = SnapshotCache()
+
+
+def get_actor_budget(data: Dict) -> Optional[float]:
+    """turns the optional budgetSecs request field into the actor wait budget"""
+    budget_secs = data.get('budgetSecs')
+    if budget_secs is None:
+        return None
+    budget_secs = float(budget_secs)
+    if budget_secs <= 0:
+        raise ValueError('budgetSecs must be a positive number')
+    return max(1.0, budget_secs - ANALYSIS_RESERVE_SECS)
+
+
+def _snapshot_fallback(actor_id: str, snapshot_key: str, limit: int, started: float,
+                       error: Exception) -> Optional[Tuple[List[Dict], Dict]]:
+    """the last snapshot for this input as a partial result, when fallbacks are on"""
+    entry = snapshot_cache.get(snapshot_key) if SNAPSHOT_FALLBACK else None
+    if entry is None:
+        return None
+    items, saved_at = entry
+    SNAPSHOT_FALLBACKS.inc(actor=actor_id)
+    return list(items), {
+        'partial': True,
+        'runStatus': 'SNAPSHOT',
+        'itemsFetched': len(items),
+        'itemsRequested': limit,
+        'elapsedSecs': round(time.time() - started, 2),
+        'fromSnapshot': True,
+        'snapshotAgeSecs': round(time.time() - saved_at),
+        'upstreamError': str(error)
+    }
+
+
+def run_actor_with_deadline(client: 'ApifyClient', actor_id: str, run_input: Dict,
+                            timeout_secs: int, limit: int,
+                            budget_secs: Optional[float] = None) -> Tuple[List[Dict], Dict]:
+    """runs an actor within a latency budget and returns (items, coverage)
+
+    if the budget runs out before the actor finishes, the run is aborted and
+    whatever items already landed in its dataset are returned as a partial result.
+    failed or timed-out runs count against the actor's circuit breaker; while it
+    is open the call raises CircuitOpenError at once (or returns the last
+    snapshot for the same input, with ACTOR_SNAPSHOT_FALLBACK=1)
+    """
+    started = time.time()
+    wait_secs = timeout_secs if budget_secs is None else max(1, min(timeout_secs, budget_secs))
+    breaker = get_breaker(actor_id)
+    snapshot_key = SnapshotCache.key(actor_id, run_input)
+
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        ACTOR_FAST_FAILURES.inc(actor=actor_id)
+        fallback = _snapshot_fallback(actor_id, snapshot_key, limit, started, e)
+        if fallback is None:
+            raise
+        return fallback
+
+    try:
+        with ACTOR_CALL_SECONDS.time(stage='actor_call', actor=actor_id):
+            # starts the actor without blocking so the wait can be cut short
+            run = client.actor(actor_id).start(run_input=run_input, timeout_secs=timeout_secs)
+            run_client = client.run(run['id'])
+            run = run_client.wait_for_finish(wait_secs=int(wait_secs)) or run
+
+        status = run.get('status', 'UNKNOWN')
+        partial = status != 'SUCCEEDED'
+
+        if status not in FINISHED_STATUSES:
+            # out of budget - stop the actor so it doesn't keep burning compute
+            try:
+                run_client.abort()
+            except Exception:
+                pass
+
+        with DATASET_FETCH_SECONDS.time(stage='dataset_fetch', actor=actor_id):
+            # dataset pages are plain reads, so transient failures are retried with jittered backoff
+            items = retry_with_backoff(
+                lambda: list(client.dataset(run['defaultDatasetId']).iterate_items(limit=limit)),
+                attempts=DATASET_READ_ATTEMPTS,
+                on_retry=lambda attempt, error: DATASET_READ_RETRIES.inc(actor=actor_id)
+            )
+
+        if status == 'FAILED' and not items:
+            raise ValueError(f"Actor run failed: {run.get('statusMessage') or 'no details'}")
+    except Exception as e:
+        breaker.record_failure()
+        fallback = _snapshot_fallback(actor_id, snapshot_key, limit, started, e)
+        if fallback is None:
+            raise
+        return fallback
+
+    if status == 'SUCCEEDED':
+        breaker.record_success()
+        if SNAPSHOT_FALLBACK and items:
+            snapshot_cache.put(snapshot_key, items)
+    elif status in FINISHED_STATUSES or wait_secs >= timeout_secs:
+        # failed, or still unfinished after the actor's whole timeout - the upstream is struggling
+        breaker.record_failure()
+    else:
+        # cut short by the caller's budget, which says nothing about the actor's health
+        breaker.record_neutral()
+
+    coverage = {
+        'partial': partial,
+        'runStatus': status,
+        'itemsFetched': len(items),
+        'itemsRequested': limit,
+        'elapsedSecs': round(time.time() - started, 2)
+    }
+    return items, coverage
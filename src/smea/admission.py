@@ -0,0 +1,213 @@
+"""
+admission control: per-client token buckets and a cap on concurrent actor runs
+
+every limited endpoint belongs to a policy: a token bucket per client (an
+allow-listed API key, else IP) and optionally a shared concurrency limiter with a bounded wait
+queue. a request over its rate, or arriving when the queue is full, gets an
+immediate 429 with Retry-After instead of tying up a worker. limits are per
+process - with N preforked workers the effective limit is N times higher
+"""
+
+import hmac
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+try:
+    from .metrics import counter
+except ImportError:
+    from metrics import counter
+
+API_KEY_HEADER = "X-API-Key"
+# clients tracked per policy; the least recently seen are forgotten first
+DEFAULT_MAX_CLIENTS = 10000
+RATE_UNITS = {"s": 1.0, "sec": 1.0, "min": 60.0, "h": 3600.0, "hour": 3600.0}
+
+ADMISSION_REJECTIONS = counter(
+    "smea_admission_rejections_total", "Requests turned away by admission control", ("policy", "reason")
+)
+
+
+def parse_api_keys(value: Optional[str]) -> FrozenSet[str]:
+    """API_KEYS="key1,key2" -> the keys whose callers get a bucket of their own"""
+    return frozenset(key.strip() for key in (value or "").split(",") if key.strip())
+
+
+class RateLimiter:
+    """token bucket per client key: `rate` tokens a second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = DEFAULT_MAX_CLIENTS):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # key -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str]) -> Optional["RateLimiter"]:
+        """parses 30/min (burst 30) or 30/min,5 (burst 5); "off" or "0" means no limit"""
+        spec = (spec or "").strip().lower()
+        if spec in ("", "off", "0", "none"):
+            return None
+        rate_part, _, burst_part = spec.partition(",")
+        count, _, unit = rate_part.partition("/")
+        if unit.strip() not in RATE_UNITS:
+            raise ValueError(f"Invalid rate limit '{spec}'. Use e.g. 30/min or 30/min,5")
+        count = float(count)
+        burst = float(burst_part) if burst_part.strip() else count
+        return cls(count / RATE_UNITS[unit.strip()], burst)
+
+    def acquire(self, key: str) -> float:
+        """takes a token; returns 0 when allowed, else the seconds until one is free"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyLimiter:
+    """at most max_concurrent holders, max_waiting queued for up to wait_secs, the rest rejected"""
+
+    def __init__(self, max_concurrent: int, max_waiting: int = 0, wait_secs: float = 0.0):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_secs = wait_secs
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> bool:
+        with self._condition:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return True
+            if self.waiting >= self.max_waiting or self.wait_secs <= 0:
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.wait_secs
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "maxConcurrent": self.max_concurrent,
+                "maxWaiting": self.max_waiting
+            }
+
+
+class AdmissionPolicy:
+    __slots__ = ("name", "rate_limiter", "concurrency")
+
+    def __init__(self, name: str, rate_limiter: Optional[RateLimiter] = None,
+                 concurrency: Optional[ConcurrencyLimiter] = None):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+
+
+class AdmissionController:
+    """maps Flask endpoint names to policies and decides whether a request may start"""
+
+    def __init__(self, trust_proxy: bool = False, api_keys: Iterable[str] = ()):
+        self.trust_proxy = trust_proxy
+        self.api_keys = tuple(api_keys)
+        self._policies: Dict[str, AdmissionPolicy] = {}
+
+    def limit(self, endpoints: Iterable[str], policy: AdmissionPolicy):
+        for endpoint in endpoints:
+            self._policies[endpoint] = policy
+
+    def policy_for(self, endpoint: Optional[str]) -> Optional[AdmissionPolicy]:
+        return self._policies.get(endpoint)
+
+    def is_known_key(self, api_key: Optional[str]) -> bool:
+        return bool(api_key) and any(
+            hmac.compare_digest(api_key.encode(), known.encode()) for known in self.api_keys
+        )
+
+    def client_key(self, headers, remote_addr: Optional[str]) -> str:
+        api_key = headers.get(API_KEY_HEADER)
+        # an unknown key is ignored - otherwise a new random key per request means a fresh bucket
+        if self.is_known_key(api_key):
+            return f"key:{api_key}"
+        if self.trust_proxy and headers.get("X-Forwarded-For"):
+            return "ip:" + headers["X-Forwarded-For"].split(",")[0].strip()
+        return f"ip:{remote_addr or 'unknown'}"
+
+    def admit(self, policy: AdmissionPolicy, client: str) -> Tuple[bool, Optional[str], float]:
+        """(admitted, rejection reason, retry-after secs)
+
+        an admitted request of a policy with a concurrency limiter holds a slot
+        until it releases it
+        """
+        if policy.rate_limiter is not None:
+            wait = policy.rate_limiter.acquire(client)
+            if wait > 0:
+                ADMISSION_REJECTIONS.inc(policy=policy.name, reason="rate_limited")
+                return False, "rate_limited", wait
+        if policy.concurrency is not None and not policy.concurrency.acquire():
+            ADMISSION_REJECTIONS.inc(policy=policy.name, reason="busy")
+            return False, "busy", max(1.0, policy.concurrency.wait_secs)
+        return True, None, 0.0
+
+
+def install_admission_control(app, controller: AdmissionController):
+    """checks every request against its endpoint's policy before the view runs"""
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def admit_request():
+        policy = controller.policy_for(request.endpoint)
+        if policy is None:
+            return None
+        admitted, reason, retry_after = controller.admit(
+            policy, controller.client_key(request.headers, request.remote_addr)
+        )
+        if not admitted:
+            error = ("Rate limit exceeded, retry later" if reason == "rate_limited"
+                     else "Server is at capacity, retry later")
+            response = jsonify({"success": False, "error": error, "retryAfterSecs": math.ceil(retry_after)})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response
+        if policy.concurrency is not None:
+            g.admission_slot = policy.concurrency
+        return None
+
+    @app.teardown_request
+    def release_admission_slot(error=None):
+        slot = g.pop("admission_slot", None)
+        if slot is not None:
+            slot.release()
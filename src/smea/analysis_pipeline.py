@@ -0,0 +1,222 @@
+"""
+the fetch -> extract -> scan -> score -> respond flow behind every analyze endpoint
+
+a platform plugs in as a PlatformAdapter: which request field names the
+target and how to build its scraping service. the PIIEngine and RiskModel
+are built once per pipeline and shared by every request, since neither keeps
+per-call state. each stage is timed into smea_pipeline_stage_seconds, the
+request's log record and any hook added with add_stage_hook()
+"""
+
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .actor_runner import get_actor_budget
+    from .circuit_breaker import CircuitOpenError
+    from .metrics import DEFAULT_BUCKETS, NETWORK_BUCKETS, histogram
+    from .pii_engine import PIIEngine
+    from .response_fields import parse_response_fields, select_fields, total_text_length
+    from .risk_model import RiskModel
+    from .scrape_profiles import DEFAULT_PROFILE, SCRAPE_PROFILES
+    from .structured_logging import StageTimings, get_logger
+except ImportError:
+    from actor_runner import get_actor_budget
+    from circuit_breaker import CircuitOpenError
+    from metrics import DEFAULT_BUCKETS, NETWORK_BUCKETS, histogram
+    from pii_engine import PIIEngine
+    from response_fields import parse_response_fields, select_fields, total_text_length
+    from risk_model import RiskModel
+    from scrape_profiles import DEFAULT_PROFILE, SCRAPE_PROFILES
+    from structured_logging import StageTimings, get_logger
+
+STAGES = ("fetch", "text_extraction", "pii_scan", "risk_scoring", "respond")
+MAX_RECOMMENDATIONS = 8
+
+# fetch takes seconds to minutes, the other stages milliseconds
+PIPELINE_STAGE_SECONDS = histogram(
+    'smea_pipeline_stage_seconds', 'Analyze pipeline time by platform and stage', ('platform', 'step'),
+    buckets=sorted(set(DEFAULT_BUCKETS) | set(NETWORK_BUCKETS))
+)
+
+logger = get_logger("analysis_pipeline")
+
+
+class AnalysisRequestError(ValueError):
+    """invalid analyze input - a 400, not a failed analysis"""
+
+
+class PlatformAdapter:
+    """how one platform plugs into the pipeline
+
+    service_factory returns an object with get_user_data(target, profile,
+    budget_secs) and extract_text_content(user_data), e.g. InstagramService
+    """
+
+    def __init__(self, platform: str, target_field: str, target_label: str, service_factory: Callable):
+        self.platform = platform
+        self.target_field = target_field
+        self.target_label = target_label
+        self.service_factory = service_factory
+
+
+class AnalysisRequest:
+    __slots__ = ("platform", "target", "profile", "budget_secs", "fields")
+
+    def __init__(self, platform: str, target: str, profile: str = DEFAULT_PROFILE,
+                 budget_secs: Optional[float] = None, fields: Optional[Set[str]] = None):
+        self.platform = platform
+        self.target = target
+        self.profile = profile
+        self.budget_secs = budget_secs
+        self.fields = fields
+
+
+class AnalysisPipeline:
+    """runs analyze requests for every registered platform with shared engines"""
+
+    def __init__(self, adapters: Iterable[PlatformAdapter] = (), pii_engine: Optional[PIIEngine] = None,
+                 risk_model: Optional[RiskModel] = None):
+        self.adapters: Dict[str, PlatformAdapter] = {}
+        self.pii_engine = pii_engine or PIIEngine()
+        self.risk_model = risk_model or RiskModel()
+        self._stage_hooks: List[Callable[[str, str, float], None]] = []
+        for adapter in adapters:
+            self.register(adapter)
+
+    def register(self, adapter: PlatformAdapter):
+        self.adapters[adapter.platform] = adapter
+
+    def add_stage_hook(self, hook: Callable[[str, str, float], None]):
+        """hook(platform, stage, seconds) runs as each stage of each request ends"""
+        self._stage_hooks.append(hook)
+
+    def parse_request(self, platform: str, data: Optional[Dict], args=None) -> AnalysisRequest:
+        """validates an analyze body (plus query string), raising AnalysisRequestError"""
+        adapter = self.adapters[platform]
+        data = data or {}
+        args = args if args is not None else {}
+        if not isinstance(data, dict):
+            raise AnalysisRequestError("Request body must be a JSON object")
+
+        target = str(data.get(adapter.target_field) or "").strip()
+        if not target:
+            raise AnalysisRequestError(f"{adapter.target_label} is required")
+
+        profile = data.get("profile") or DEFAULT_PROFILE
+        if not isinstance(profile, str) or profile not in SCRAPE_PROFILES:
+            raise AnalysisRequestError(f"Unknown scrape profile. Use one of: {', '.join(SCRAPE_PROFILES)}")
+
+        try:
+            budget_secs = get_actor_budget(data)
+        except (TypeError, ValueError):
+            raise AnalysisRequestError("budgetSecs must be a positive number")
+
+        try:
+            # slim=true / fields=... leave the echoed userData and textContent out
+            fields = parse_response_fields(data, args)
+        except ValueError as e:
+            raise AnalysisRequestError(str(e))
+
+        return AnalysisRequest(platform, target, profile, budget_secs, fields)
+
+    def _on_stage(self, platform: str):
+        def observe(stage: str, secs: float):
+            PIPELINE_STAGE_SECONDS.observe(secs, platform=platform, step=stage)
+            for hook in self._stage_hooks:
+                hook(platform, stage, secs)
+        return observe
+
+    def run(self, analysis_request: AnalysisRequest) -> Dict:
+        """the full analyze response; service errors propagate"""
+        platform = analysis_request.platform
+        adapter = self.adapters[platform]
+        timings = StageTimings(on_stage=self._on_stage(platform))
+        logger.debug(f"{platform} analysis started", extra={
+            "target": analysis_request.target, "profile": analysis_request.profile
+        })
+
+        with timings.stage("fetch"):
+            service = adapter.service_factory()
+            user_data = service.get_user_data(
+                analysis_request.target, analysis_request.profile, analysis_request.budget_secs
+            )
+
+        with timings.stage("text_extraction"):
+            text_content = service.extract_text_content(user_data)
+
+        with timings.stage("pii_scan"):
+            findings = self.pii_engine.scan_for_pii(text_content)
+
+        with timings.stage("risk_scoring"):
+            analysis_data = [{"platform": platform, "findings": findings}]
+            risk_score = self.risk_model.calculate_risk_score(analysis_data)
+            risk_level = self.risk_model.get_risk_level(risk_score)
+            recommendations = self.risk_model.generate_recommendations(analysis_data)
+
+        with timings.stage("respond"):
+            user = user_data.get("user", {})
+            response = {
+                "success": True,
+                "userData": user_data,
+                "textContent": text_content,
+                "findings": findings,
+                "riskScore": risk_score,
+                "riskLevel": risk_level,
+                "recommendations": recommendations[:MAX_RECOMMENDATIONS],
+                "totalFindings": len(findings),
+                "scrapeProfile": analysis_request.profile,
+                "partial": user_data["coverage"]["partial"],
+                "coverage": user_data["coverage"],
+                "severityBreakdown": self.pii_engine.get_summary(findings),
+                "profileStats": {
+                    "postsAnalyzed": len(text_content.get("posts", [])),
+                    "commentsAnalyzed": len(text_content.get("comments", [])),
+                    "totalTextLength": total_text_length(text_content),
+                    "hasProfilePicture": bool(user.get("profilePictureUrl")),
+                    "isVerified": user.get("isVerified", False)
+                }
+            }
+
+        logger.info(f"{platform} analysis finished", extra={
+            "target": analysis_request.target,
+            "profile": analysis_request.profile,
+            "posts": response["profileStats"]["postsAnalyzed"],
+            "comments": response["profileStats"]["commentsAnalyzed"],
+            "findings": len(findings),
+            "riskScore": risk_score,
+            "riskLevel": risk_level,
+            "partial": response["partial"],
+            "stagesMs": timings.stages,
+            "durationMs": timings.total_ms()
+        })
+        return response
+
+    def handle(self, platform: str, data: Optional[Dict], args=None) -> Tuple[Dict, int, Dict]:
+        """parse + run for a route: (response body, HTTP status, extra headers)"""
+        try:
+            analysis_request = self.parse_request(platform, data, args)
+        except AnalysisRequestError as e:
+            return {"error": str(e)}, 400, {}
+
+        try:
+            response = self.run(analysis_request)
+        except CircuitOpenError as e:
+            # the scraper is down - answer now instead of holding the worker for its timeout
+            logger.warning(f"{platform} analysis failed fast: %s", str(e))
+            retry_after = math.ceil(e.retry_after)
+            return {
+                "success": False,
+                "error": f"Analysis temporarily unavailable: {str(e)}",
+                "retryAfterSecs": retry_after
+            }, 503, {"Retry-After": str(retry_after)}
+        except ValueError as e:
+            error_msg = f"Configuration error: {str(e)}"
+            logger.error(f"{platform} analysis failed: %s", error_msg)
+            return {"success": False, "error": error_msg}, 500, {}
+        except Exception as e:
+            error_msg = f"Analysis failed: {str(e)}"
+            logger.error(f"{platform} analysis failed: %s", error_msg, exc_info=True)
+            return {"success": False, "error": error_msg}, 500, {}
+
+        return select_fields(response, analysis_request.fields), 200, {}
@@ -0,0 +1,106 @@
+"""
+circuit breaker and jittered retries for calls to a flaky upstream
+
+after `failure_threshold` consecutive failures the breaker opens and calls
+fail at once with CircuitOpenError instead of waiting out another timeout.
+after `reset_secs` one trial call is let through (half-open): success closes
+the breaker, failure opens it again. state is per process
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+try:
+    from .structured_logging import get_logger
+except ImportError:
+    from structured_logging import get_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+logger = get_logger("circuit_breaker")
+
+
+class CircuitOpenError(Exception):
+    """the upstream is failing and isn't being called; retry after `retry_after` seconds"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is failing, not retrying it for {math.ceil(retry_after)}s")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_secs: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_secs = reset_secs
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """raises CircuitOpenError unless a call may go ahead now"""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_secs - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # one trial at a time; everyone else keeps failing fast until it reports back
+                if self._trial_in_flight:
+                    raise CircuitOpenError(self.name, self.reset_secs)
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("circuit closed", extra={"circuit": self.name})
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("circuit opened", extra={
+                        "circuit": self.name, "failures": self.failures, "resetSecs": self.reset_secs
+                    })
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_neutral(self):
+        """a call that proved nothing either way (e.g. cut short by the caller's budget)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def is_transient(error: Exception) -> bool:
+    """client errors (4xx other than 429) won't go away by retrying"""
+    status = getattr(error, "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+
+def retry_with_backoff(func: Callable, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0,
+                       on_retry: Optional[Callable[[int, Exception], None]] = None):
+    """calls func until it succeeds, sleeping a full-jitter exponential delay between tries"""
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            if on_retry is not None:
+                on_retry(attempt + 1, e)
+            # full jitter keeps concurrent retries from hitting the upstream in lockstep
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
@@ -3,6 +3,21 @@ import os
 from typing import Dict, List, Optional
 from apify_client import ApifyClient
 
+try:
+    from .scrape_profiles import DEFAULT_PROFILE, get_scrape_profile
+    from .actor_runner import run_actor_with_deadline
+    from .circuit_breaker import CircuitOpenError
+    from .metrics import histogram
+except ImportError:
+    from scrape_profiles import DEFAULT_PROFILE, get_scrape_profile
+    from actor_runner import run_actor_with_deadline
+    from circuit_breaker import CircuitOpenError
+    from metrics import histogram
+
+TEXT_EXTRACTION_SECONDS = histogram(
+    'smea_text_extraction_seconds', 'Time to pull scannable text out of scraped data', ('platform',)
+)
+
 class FacebookService:
     def __init__(self, apify_token: str):
         self.apify_token = apify_token
@@ -10,12 +25,16 @@ class FacebookService:
         # Facebook Posts Scraper actor ID from Apify
         self.actor_id = 'KoJrdxJCTtpon81KY'
 
-    def get_user_data(self, page_url: str) -> Dict:
+    def get_user_data(self, page_url: str, profile: str = DEFAULT_PROFILE,
+                      budget_secs: Optional[float] = None) -> Dict:
         """scrapes Facebook page data using Apify"""
         try:
             if not page_url:
                 raise ValueError('Page URL is required')
 
+            settings = get_scrape_profile(profile, 'facebook')
+            max_comments = settings['maxComments']
+
             # Clean and validate the URL
             if not page_url.startswith('http'):
                 page_url = f"https://www.facebook.com/{page_url}"
@@ -23,46 +42,53 @@ class FacebookService:
             # Remove trailing slash and ensure proper format
             page_url = page_url.rstrip('/')
 
-            # prepares actor input for Facebook scraper - optimized for speed
+            # prepares actor input for Facebook scraper - depth comes from the scrape profile
             run_input = {
                 "startUrls": [{"url": page_url}],
-                "resultsLimit": 35,  # Reduced to 35 for faster scraping (Facebook is slower than Instagram)
+                "resultsLimit": settings['resultsLimit'],
                 "captionText": True,
-                "includeComments": False,  # Disabled for faster scraping
-                "maxComments": 0,  # No comments for speed optimization
-                "scrapeAbout": False,  # Skip about section for speed
+                "includeComments": max_comments > 0,
+                "maxComments": max_comments,
+                "scrapeAbout": settings['scrapeAbout'],
                 "scrapeReviews": False,  # Skip reviews for speed
                 "scrapeServices": False,  # Skip services for speed
                 "scrapePosts": True,  # Only scrape posts
             }
 
-            # runs the actor and wait for it to finish (with timeout for speed)
-            run = self.client.actor(self.actor_id).call(
-                run_input=run_input,
-                timeout_secs=120  # 2 minute timeout to fail fast
+            # runs the actor, cutting it short when the latency budget runs out
+            items, coverage = run_actor_with_deadline(
+                self.client,
+                self.actor_id,
+                run_input,
+                timeout_secs=settings['timeoutSecs'],
+                limit=settings['resultsLimit'],
+                budget_secs=budget_secs
             )
             
-            # fetches results from the run's dataset (limit to speed up)
-            dataset = self.client.dataset(run["defaultDatasetId"])
-            items = list(dataset.iterate_items(limit=35))  # Limit for speed
-            
-            if not items:
+            # a partial run with nothing scraped yet still returns an (empty) result
+            if not items and not coverage['partial']:
                 raise ValueError('No data returned from Facebook scraper')
 
-            processed_data = self._process_results(items, page_url)
+            processed_data = self._process_results(items, page_url, max_comments, settings['scrapeAbout'])
             
             return {
                 'platform': 'facebook',
                 'user': processed_data['user'],
                 'posts': processed_data['posts'],
                 'page_info': processed_data['page_info'],
+                'scrapeProfile': profile,
+                'coverage': coverage,
                 'fetchedAt': time.time()
             }
 
+        except CircuitOpenError:
+            # failing fast - callers tell this apart to answer 503 with Retry-After
+            raise
         except Exception as e:
             raise Exception(f'Facebook service error: {str(e)}')
 
-    def _process_results(self, results: List[Dict], page_url: str) -> Dict:
+    def _process_results(self, results: List[Dict], page_url: str,
+                         max_comments: int = 0, scrape_about: bool = False) -> Dict:
         """processes raw Apify results - optimized for speed"""
         # Extract page info from the first result or create default
         first_result = results[0] if results else {}
@@ -96,7 +122,7 @@ class FacebookService:
                     'likesCount': 0,  # Skip for speed
                     'commentsCount': 0,  # Skip for speed
                     'sharesCount': 0,  # Skip for speed
-                    'comments': []  # No comments for speed
+                    'comments': self._process_comments(item.get('comments'), max_comments)
                 }
                 for item in results
                 if item.get('text', '').strip()  # Only include posts with text
@@ -104,38 +130,39 @@ class FacebookService:
             'count': len(results)
         }
 
-        # Minimal page info
+        # Minimal page info, about fields only when the profile scraped them
         page_info = {
             'name': first_result.get('pageName', page_name),
             'description': first_result.get('pageDescription', ''),
-            'category': '',  # Skip for speed
-            'website': '',  # Skip for speed
-            'location': ''  # Skip for speed
+            'category': first_result.get('pageCategory', '') if scrape_about else '',
+            'website': first_result.get('pageWebsite', '') if scrape_about else '',
+            'location': first_result.get('pageAddress', '') if scrape_about else ''
         }
 
         return {'user': user, 'posts': posts, 'page_info': page_info}
 
-    def _process_comments(self, comments) -> List[Dict]:
+    def _process_comments(self, comments, limit: int = 10) -> List[Dict]:
         """processes Facebook comments"""
         # Handle case where comments might be an integer (count) or None
         if not comments or isinstance(comments, (int, str)):
             return []
         
         # Ensure comments is a list
-        if not isinstance(comments, list):
+        if not isinstance(comments, list) or limit <= 0:
             return []
         
         return [
             {
                 'id': comment.get('commentId'),
-                'text': comment.get('text', ''),
+                'text': comment.get('text') or '',
                 'author': comment.get('authorName', ''),
                 'timestamp': comment.get('createdTime'),
                 'likesCount': comment.get('likesCount', 0)
             }
-            for comment in comments[:10]  # Limit to first 10 comments
+            for comment in comments[:limit]
         ]
 
+    @TEXT_EXTRACTION_SECONDS.timed(stage='text_extraction', platform='facebook')
     def extract_text_content(self, user_data: Dict) -> Dict:
         """extracts text content for PII analysis"""
         text_content = {
@@ -151,6 +178,21 @@ class FacebookService:
                 for post in user_data['posts']['data']
                 if post.get('message', '').strip()
             ]
+            # comments only exist when the scrape profile asked for them
+            text_content['comments'] = [
+                comment['text']
+                for post in user_data['posts']['data']
+                for comment in post.get('comments', [])
+                if comment.get('text', '').strip()
+            ]
+
+        # about section text is scanned alongside the description
+        page_info = user_data.get('page_info', {})
+        about_text = ' '.join(
+            page_info.get(field, '') for field in ('category', 'website', 'location') if page_info.get(field)
+        )
+        if about_text:
+            text_content['about'] = about_text
 
         return text_content
 
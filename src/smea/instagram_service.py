@@ -3,6 +3,21 @@ import os
 from typing import Dict, List, Optional
 from apify_client import ApifyClient
 
+try:
+    from .scrape_profiles import DEFAULT_PROFILE, get_scrape_profile
+    from .actor_runner import run_actor_with_deadline
+    from .circuit_breaker import CircuitOpenError
+    from .metrics import histogram
+except ImportError:
+    from scrape_profiles import DEFAULT_PROFILE, get_scrape_profile
+    from actor_runner import run_actor_with_deadline
+    from circuit_breaker import CircuitOpenError
+    from metrics import histogram
+
+TEXT_EXTRACTION_SECONDS = histogram(
+    'smea_text_extraction_seconds', 'Time to pull scannable text out of scraped data', ('platform',)
+)
+
 class InstagramService:
     def __init__(self, apify_token: str):
         self.apify_token = apify_token
@@ -10,48 +25,57 @@ class InstagramService:
         # updated to the actor ID from your example - this is the correct Instagram scraper
         self.actor_id = 'shu8hvrXbJbY3Eb9W'
 
-    def get_user_data(self, username: str) -> Dict:
+    def get_user_data(self, username: str, profile: str = DEFAULT_PROFILE,
+                      budget_secs: Optional[float] = None) -> Dict:
         """scrapes Instagram user data using Apify"""
         try:
             if not username:
                 raise ValueError('Username is required')
 
-            # prepares actor input for Instagram scraper
+            settings = get_scrape_profile(profile, 'instagram')
+
+            # prepares actor input for Instagram scraper - depth comes from the scrape profile
             run_input = {
                 "directUrls": [f"https://www.instagram.com/{username}/"],
                 "resultsType": "posts",
-                "resultsLimit": 50,
+                "resultsLimit": settings['resultsLimit'],
                 "addParentData": False
             }
 
-            # runs the actor and wait for it to finish (with timeout for speed)
-            run = self.client.actor(self.actor_id).call(
-                run_input=run_input,
-                timeout_secs=90  # 90 second timeout to fail fast
+            # runs the actor, cutting it short when the latency budget runs out
+            items, coverage = run_actor_with_deadline(
+                self.client,
+                self.actor_id,
+                run_input,
+                timeout_secs=settings['timeoutSecs'],
+                limit=settings['resultsLimit'],
+                budget_secs=budget_secs
             )
             
-            # fetches results from the run's dataset (limit to speed up)
-            dataset = self.client.dataset(run["defaultDatasetId"])
-            items = list(dataset.iterate_items(limit=50))  # Limit for speed
-            
-            if not items:
+            # a partial run with nothing scraped yet still returns an (empty) result
+            if not items and not coverage['partial']:
                 raise ValueError('No data returned from Instagram scraper')
 
-            processed_data = self._process_results(items, username)
+            processed_data = self._process_results(items, username, settings['maxComments'])
             
             return {
                 'platform': 'instagram',
                 'user': processed_data['user'],
                 'media': processed_data['media'],
                 'biography': processed_data['biography'],
+                'scrapeProfile': profile,
+                'coverage': coverage,
                 'fetchedAt': time.time()
             }
 
+        except CircuitOpenError:
+            # failing fast - callers tell this apart to answer 503 with Retry-After
+            raise
         except Exception as e:
             raise Exception(f'Instagram service error: {str(e)}')
 
 
-    def _process_results(self, results: List[Dict], username: str) -> Dict:
+    def _process_results(self, results: List[Dict], username: str, max_comments: int = 0) -> Dict:
         """processes raw Apify results"""
         first_result = results[0] if results else {}
         
@@ -78,7 +102,7 @@ class InstagramService:
                     'thumbnailUrl': item.get('displayUrl'),
                     'likesCount': item.get('likesCount', 0),
                     'commentsCount': item.get('commentsCount', 0),
-                    'comments': []
+                    'comments': self._process_comments(item.get('latestComments'), max_comments)
                 }
                 for item in results
             ],
@@ -88,6 +112,23 @@ class InstagramService:
         biography = first_result.get('biography', '')
         return {'user': user, 'media': media, 'biography': biography}
 
+    def _process_comments(self, comments, limit: int = 0) -> List[Dict]:
+        """processes the latest comments attached to a post"""
+        if not isinstance(comments, list) or limit <= 0:
+            return []
+
+        return [
+            {
+                'id': comment.get('id'),
+                'text': comment.get('text') or '',
+                'author': comment.get('ownerUsername', ''),
+                'timestamp': comment.get('timestamp'),
+                'likesCount': comment.get('likesCount', 0)
+            }
+            for comment in comments[:limit]
+        ]
+
+    @TEXT_EXTRACTION_SECONDS.timed(stage='text_extraction', platform='instagram')
     def extract_text_content(self, user_data: Dict) -> Dict:
         """extracts text content for PII analysis"""
         text_content = {
@@ -103,6 +144,13 @@ class InstagramService:
                 for post in user_data['media']['data']
                 if post.get('caption', '').strip()
             ]
+            # comments only exist when the scrape profile asked for them
+            text_content['comments'] = [
+                comment['text']
+                for post in user_data['media']['data']
+                for comment in post.get('comments', [])
+                if comment.get('text', '').strip()
+            ]
 
         return text_content
 
@@ -0,0 +1,330 @@
+"""
+minimal Prometheus-style metrics: counters and histograms in the text exposition format
+
+each module registers the metrics it owns with counter()/histogram() (which
+return the existing metric when the name is already registered) and the
+apps serve render_metrics() at /metrics. observing is a lock plus a bisect,
+cheap enough for every request.
+
+values live in the process that observed them. with METRICS_MULTIPROC_DIR
+set, every process writes a snapshot there every few seconds and /metrics
+sums all of them, so a scrape reports the whole server whichever worker
+answers it. snapshots of exited workers stay, keeping counters monotonic
+"""
+
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# seconds - tuned for in-process work like scanning and scoring
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# seconds - Apify actor runs and dataset reads
+NETWORK_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 180.0, 300.0, 600.0)
+
+# how often each process writes its snapshot to METRICS_MULTIPROC_DIR
+DEFAULT_FLUSH_SECS = 5.0
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """monotonic counter, optionally labeled"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._callback: Optional[Callable[[], Dict[Tuple, float]]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_callback(self, callback: Callable[[], Dict[Tuple, float]]):
+        """reads the values at scrape time instead - for components that already count"""
+        self._callback = callback
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self) -> Dict[Tuple, float]:
+        if self._callback is not None:
+            return self._callback()
+        with self._lock:
+            return dict(self._values)
+
+    def to_snapshot(self) -> List:
+        return [[[str(v) for v in key], value] for key, value in self.collect().items()]
+
+    def merge_snapshot(self, merged: Dict[Tuple, float], entries: List):
+        for key, value in entries:
+            key = tuple(key)
+            merged[key] = merged.get(key, 0) + value
+
+    def render(self, values: Optional[Dict[Tuple, float]] = None):
+        if values is None:
+            values = self.collect()
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _Timer:
+    """context manager that observes its elapsed time (and counts errors by stage)"""
+
+    __slots__ = ("histogram", "labels", "stage", "started")
+
+    def __init__(self, histogram: "Histogram", stage: Optional[str], labels: Dict):
+        self.histogram = histogram
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        if exc_type is not None and self.stage is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        return False
+
+
+class Histogram:
+    """cumulative-bucket histogram, optionally labeled"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def time(self, stage: Optional[str] = None, **labels) -> _Timer:
+        """times a with-block; an exception inside also counts as an error of `stage`"""
+        return _Timer(self, stage, labels)
+
+    def timed(self, stage: Optional[str] = None, **labels):
+        """decorator form of time()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Timer(self, stage, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self) -> Dict[Tuple, Tuple[list, float]]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def to_snapshot(self) -> List:
+        return [[[str(v) for v in key], counts, total] for key, (counts, total) in self.collect().items()]
+
+    def merge_snapshot(self, merged: Dict[Tuple, Tuple[list, float]], entries: List):
+        for key, counts, total in entries:
+            if len(counts) != len(self.buckets) + 1:
+                # written by a process with other buckets (an older deploy) - can't be added up
+                continue
+            key = tuple(key)
+            previous = merged.get(key)
+            if previous is not None:
+                counts = [a + b for a, b in zip(previous[0], counts)]
+                total += previous[1]
+            merged[key] = (counts, total)
+
+    def render(self, values: Optional[Dict[Tuple, Tuple[list, float]]] = None):
+        if values is None:
+            values = self.collect()
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+def _get_or_create(name: str, factory: Callable):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = factory()
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _get_or_create(name, lambda: Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+
+def _registered_metrics() -> list:
+    with _registry_lock:
+        return [_registry[name] for name in sorted(_registry)]
+
+
+_multiproc_dir: Optional[str] = os.getenv("METRICS_MULTIPROC_DIR") or None
+_snapshot_path: Optional[str] = None
+_snapshot_pid: Optional[int] = None
+_writer = None
+_writer_pid: Optional[int] = None
+
+
+def set_multiprocess_dir(directory: Optional[str], clear: bool = False):
+    """aggregates across processes through `directory` (None = this process only)
+
+    clear=True removes the snapshots of an earlier run - call it in the parent
+    before any worker starts
+    """
+    global _multiproc_dir
+    _multiproc_dir = directory or None
+    if _multiproc_dir is None:
+        return
+    os.makedirs(_multiproc_dir, exist_ok=True)
+    if clear:
+        for path in glob.glob(os.path.join(_multiproc_dir, "metrics-*.json")):
+            os.remove(path)
+
+
+def write_snapshot():
+    """writes this process's values to its own file in the multiprocess dir"""
+    global _snapshot_path, _snapshot_pid
+    if _multiproc_dir is None:
+        return
+    if _snapshot_pid != os.getpid():
+        # pid plus start time - a recycled pid must not overwrite an exited worker's totals
+        _snapshot_pid = os.getpid()
+        _snapshot_path = os.path.join(_multiproc_dir, f"metrics-{_snapshot_pid}-{time.time_ns()}.json")
+    snapshot = {metric.name: metric.to_snapshot() for metric in _registered_metrics()}
+    tmp_path = f"{_snapshot_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, _snapshot_path)
+
+
+def _read_snapshots() -> List[Dict]:
+    snapshots = []
+    for path in glob.glob(os.path.join(_multiproc_dir, "metrics-*.json")):
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            # removed or replaced while listing
+            continue
+    return snapshots
+
+
+def _write_periodically(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            write_snapshot()
+        except OSError:
+            pass
+
+
+def start_metrics_writer(interval: Optional[float] = None, forked: bool = False):
+    """writes this process's snapshot every METRICS_FLUSH_SECS; a no-op without a multiprocess dir
+
+    threads don't survive fork(), so each worker calls this after forking, with
+    forked=True: the values it inherited are already in the parent's snapshot
+    """
+    global _writer, _writer_pid
+    if _multiproc_dir is None or (_writer is not None and _writer_pid == os.getpid()):
+        return
+    if forked:
+        for metric in _registered_metrics():
+            metric.reset()
+    interval = interval or float(os.getenv("METRICS_FLUSH_SECS", str(DEFAULT_FLUSH_SECS)))
+    write_snapshot()
+    _writer = threading.Thread(target=_write_periodically, args=(interval,), name="metrics-writer", daemon=True)
+    _writer.start()
+    _writer_pid = os.getpid()
+
+
+def _write_final_snapshot():
+    # what a worker counted since its last flush still counts after it exits
+    if _writer is not None and _writer_pid == os.getpid():
+        write_snapshot()
+
+
+atexit.register(_write_final_snapshot)
+
+
+def render_metrics() -> str:
+    """every registered metric in the Prometheus text format (version 0.0.4)
+
+    with a multiprocess dir, the sum over every process that wrote a snapshot
+    """
+    metrics = _registered_metrics()
+    if _multiproc_dir is None:
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    # this process's own file first, so the answer includes everything up to now
+    write_snapshot()
+    snapshots = _read_snapshots()
+    lines = []
+    for metric in metrics:
+        merged = {}
+        for snapshot in snapshots:
+            metric.merge_snapshot(merged, snapshot.get(metric.name, ()))
+        lines.extend(metric.render(merged))
+    return "\n".join(lines) + "\n"
+
+
+# shared by every stage that times itself with stage=...
+STAGE_ERRORS = counter("smea_errors_total", "Errors by pipeline stage", ("stage",))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
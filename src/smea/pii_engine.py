@@ -2,6 +2,14 @@ import re
 from typing import Dict, List, Any, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+try:
+    from .metrics import counter, histogram
+except ImportError:
+    from metrics import counter, histogram
+
+PII_SCAN_SECONDS = histogram('smea_pii_scan_seconds', 'PIIEngine.scan_for_pii time')
+PII_FINDINGS = counter('smea_pii_findings_total', 'PII findings by type', ('type',))
+
 class PIIEngine:
     def __init__(self):
         self.patterns = {
@@ -107,6 +115,7 @@ class PIIEngine:
             }
         }
 
+    @PII_SCAN_SECONDS.timed(stage='pii_scan')
     def scan_for_pii(self, text_data: Union[str, Dict]) -> List[Dict]:
         """scans text data for PII patterns with parallel processing"""
         findings = []
@@ -143,7 +152,10 @@ class PIIEngine:
                 location_findings = self._scan_text(text, location, index)
                 findings.extend(location_findings)
         
-        return self._deduplicate_findings(findings)
+        findings = self._deduplicate_findings(findings)
+        for finding in findings:
+            PII_FINDINGS.inc(type=finding['type'])
+        return findings
 
     def _normalize_text_data(self, text_data: Union[str, Dict]) -> Dict:
         """normalizes different input formats"""
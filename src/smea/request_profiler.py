@@ -0,0 +1,201 @@
+"""
+opt-in sampling profiler for single production requests
+
+a request sent with `X-Profile: 1` (or `?_profile=1`) and the admin token in
+`X-Admin-Token` runs under a sampler thread that snapshots the request
+thread's stack - and those of threads started during the request, like the
+PII scan workers - every few milliseconds. the counts are stored as collapsed
+stacks ("root;caller;callee count" per line), the input format of
+flamegraph.pl, speedscope and inferno, and served back by profile id.
+without PROFILING_ADMIN_TOKEN no hook is installed at all
+"""
+
+import contextvars
+import hmac
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+try:
+    from .structured_logging import get_logger, get_request_id
+except ImportError:
+    from structured_logging import get_logger, get_request_id
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "_profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+DEFAULT_INTERVAL_MS = 5.0
+# a forgotten flag on a stuck request stops sampling here
+DEFAULT_MAX_SECS = 600.0
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+# "ThreadPoolExecutor-3_1" -> "ThreadPoolExecutor", so every pool merges into one root
+THREAD_NUMBER_SUFFIX = re.compile(r"[-_]\d+(_\d+)?$")
+
+_profiling = contextvars.ContextVar("smea_profiling", default=False)
+
+logger = get_logger("request_profiler")
+
+
+def is_profiling() -> bool:
+    """True inside a profiled request - lets routes keep its work on the sampled threads"""
+    return _profiling.get()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+
+def _collapse(frame, root: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """samples one thread's stack, plus threads born while it runs, from a daemon thread"""
+
+    def __init__(self, thread_id: int, interval_ms: float = DEFAULT_INTERVAL_MS,
+                 max_secs: float = DEFAULT_MAX_SECS):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000.0
+        self.max_secs = max_secs
+        self.samples = Counter()
+        self.sample_count = 0
+        self.started = None
+        self.duration_secs = None
+        self._existing = set()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def _run(self):
+        sampler_id = threading.get_ident()
+        deadline = self.started + self.max_secs
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.thread_id:
+                    root = "request"
+                elif thread_id not in self._existing and thread_id != sampler_id:
+                    root = THREAD_NUMBER_SUFFIX.sub("", names.get(thread_id, "worker"))
+                else:
+                    continue
+                self.samples[_collapse(frame, root)] += 1
+            self.sample_count += 1
+            if self._stop.wait(self.interval) or time.perf_counter() >= deadline:
+                break
+
+    def start(self):
+        self._existing = set(sys._current_frames())
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        self._sampler.join()
+        self.duration_secs = time.perf_counter() - self.started
+        return dict(self.samples)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+
+def profile_path(profile_dir: str, profile_id: str) -> Optional[str]:
+    """where a stored profile lives; None for ids that aren't safe file names"""
+    if not PROFILE_ID_PATTERN.match(profile_id or ""):
+        return None
+    return os.path.join(profile_dir, f"{profile_id}.collapsed")
+
+
+def token_matches(expected: Optional[str], given: Optional[str]) -> bool:
+    """constant-time X-Admin-Token check; an unconfigured token never matches"""
+    return bool(expected) and bool(given) and hmac.compare_digest(expected.encode(), given.encode())
+
+
+def install_request_profiling(app, admin_token: Optional[str] = None, profile_dir: Optional[str] = None):
+    """adds the profiling hooks and GET /admin/profiles/<id> when an admin token is configured
+
+    PROFILING_ADMIN_TOKEN enables it, PROFILING_DIR is where profiles are kept,
+    PROFILING_INTERVAL_MS sets the sampling interval
+    """
+    admin_token = admin_token or os.getenv("PROFILING_ADMIN_TOKEN")
+    if not admin_token:
+        return False
+
+    from flask import Response, g, jsonify, request
+
+    profile_dir = profile_dir or os.getenv("PROFILING_DIR") or os.path.join(tempfile.gettempdir(), "smea-profiles")
+    interval_ms = float(os.getenv("PROFILING_INTERVAL_MS", str(DEFAULT_INTERVAL_MS)))
+
+    def finish_profile():
+        profiler = g.pop("request_profiler", None)
+        if profiler is None:
+            return None
+        _profiling.set(False)
+        profiler.stop()
+        # named after the request id, unless the caller's id isn't a safe file name
+        profile_id = get_request_id()
+        if profile_path(profile_dir, profile_id) is None:
+            profile_id = f"profile-{int(time.time() * 1000)}"
+        os.makedirs(profile_dir, exist_ok=True)
+        with open(profile_path(profile_dir, profile_id), "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        logger.info("request profile stored", extra={
+            "profileId": profile_id,
+            "path": request.path,
+            "samples": profiler.sample_count,
+            "durationMs": round(profiler.duration_secs * 1000, 2)
+        })
+        return profiler, profile_id
+
+    @app.before_request
+    def start_request_profile():
+        if not (request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)):
+            return None
+        if request.path.startswith("/admin/profiles"):
+            return None
+        if not token_matches(admin_token, request.headers.get(ADMIN_TOKEN_HEADER)):
+            return jsonify({"success": False, "error": "Profiling needs a valid admin token"}), 403
+        profiler = SamplingProfiler(threading.get_ident(), interval_ms)
+        g.request_profiler = profiler
+        _profiling.set(True)
+        profiler.start()
+        return None
+
+    @app.after_request
+    def stop_request_profile(response):
+        finished = finish_profile()
+        if finished is not None:
+            profiler, profile_id = finished
+            response.headers["X-Profile-Id"] = profile_id
+            response.headers["X-Profile-Samples"] = str(profiler.sample_count)
+        return response
+
+    @app.teardown_request
+    def discard_request_profile(error=None):
+        # after_request didn't run (the response failed), still stop the sampler
+        if "request_profiler" in g:
+            finish_profile()
+
+    @app.route("/admin/profiles/<profile_id>", methods=["GET"])
+    def get_request_profile(profile_id):
+        """a stored profile as collapsed stacks, for flamegraph.pl or speedscope"""
+        if not token_matches(admin_token, request.headers.get(ADMIN_TOKEN_HEADER)):
+            return jsonify({"success": False, "error": "Profiles need a valid admin token"}), 403
+        path = profile_path(profile_dir, profile_id)
+        if path is None or not os.path.exists(path):
+            return jsonify({"success": False, "error": "Profile not found"}), 404
+        with open(path, encoding="utf-8") as f:
+            return Response(f.read(), mimetype="text/plain")
+
+    return True
@@ -0,0 +1,138 @@
+"""
+faster JSON and negotiated compression for the Flask apps
+
+install_json_provider() swaps Flask's stdlib-json provider for orjson, which
+serializes analyze payloads several times faster and writes bytes directly.
+install_compression() gzips (or brotli-compresses, when the client accepts it
+and the brotli package is installed) text responses above a size threshold.
+both fall back quietly when their optional package is missing
+"""
+
+import gzip
+import os
+from typing import Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # optional - the stdlib provider stays in place
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/x-ndjson", "text/plain", "text/html", "text/csv"
+}
+# below this a response fits in a packet or two and compressing only costs CPU
+DEFAULT_MIN_BYTES = 1024
+# speed over ratio - responses are compressed on the request thread
+DEFAULT_GZIP_LEVEL = 5
+DEFAULT_BROTLI_QUALITY = 5
+
+
+def make_orjson_provider_class():
+    """a DefaultJSONProvider that encodes with orjson; same key sorting and debug indenting"""
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        def _options(self, pretty: bool = False) -> int:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return option
+
+        def dumps(self, obj, **kwargs) -> str:
+            return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            pretty = self.compact is False or (self.compact is None and self._app.debug)
+            body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+            return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+    return OrjsonProvider
+
+
+def install_json_provider(app, encoder: Optional[str] = None) -> str:
+    """JSON_ENCODER=orjson (default when installed) or stdlib; returns the one in use"""
+    encoder = (encoder or os.getenv("JSON_ENCODER", "orjson")).lower()
+    if encoder == "orjson" and orjson is not None:
+        app.json = make_orjson_provider_class()(app)
+        return "orjson"
+    return "stdlib"
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """br when available and accepted, else gzip, else None"""
+    accepted = _accepted_encodings(accept_encoding or "")
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = DEFAULT_GZIP_LEVEL,
+             brotli_quality: int = DEFAULT_BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps identical bodies byte-identical (and cacheable)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def install_compression(app, min_bytes: Optional[int] = None):
+    """compresses text responses of at least min_bytes for clients that accept it
+
+    RESPONSE_COMPRESSION_MIN_BYTES sets the threshold (0 turns compression off),
+    RESPONSE_GZIP_LEVEL and RESPONSE_BROTLI_QUALITY the effort
+    """
+    from flask import request
+
+    if min_bytes is None:
+        min_bytes = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", str(DEFAULT_MIN_BYTES)))
+    if min_bytes <= 0:
+        return False
+    gzip_level = int(os.getenv("RESPONSE_GZIP_LEVEL", str(DEFAULT_GZIP_LEVEL)))
+    brotli_quality = int(os.getenv("RESPONSE_BROTLI_QUALITY", str(DEFAULT_BROTLI_QUALITY)))
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough
+                or response.is_streamed or "Content-Encoding" in response.headers
+                or response.status_code < 200 or response.status_code in (204, 304)):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None or (response.content_length or 0) < min_bytes:
+            return response
+        response.set_data(compress(response.get_data(), encoding, gzip_level, brotli_quality))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return True
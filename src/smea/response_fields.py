@@ -0,0 +1,61 @@
+"""
+field selection for analyze responses
+
+a full response echoes the scraped data back (userData with every media URL,
+textContent with every post), which dwarfs the findings. API clients that only
+need the verdict ask for `slim=true` or a `fields=` list, in the JSON body or
+the query string, and the echoed data is never serialized
+"""
+
+from typing import Dict, Optional, Set
+
+# every top-level key of an analyze response
+RESPONSE_FIELDS = (
+    "userData", "textContent", "findings", "riskScore", "riskLevel", "recommendations",
+    "totalFindings", "scrapeProfile", "partial", "coverage", "severityBreakdown", "profileStats"
+)
+# score, findings and summary - everything except the echoed raw data
+SLIM_FIELDS = tuple(field for field in RESPONSE_FIELDS if field not in ("userData", "textContent"))
+
+
+def _is_true(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return value is True
+
+
+def parse_response_fields(data: Optional[Dict], args) -> Optional[Set[str]]:
+    """fields the caller asked for, or None for the full response
+
+    `fields` is a list or a comma separated string; `slim=true` means SLIM_FIELDS
+    """
+    data = data or {}
+    fields = data.get("fields", args.get("fields"))
+    if fields is not None:
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(",") if field.strip()]
+        if not isinstance(fields, list) or not fields:
+            raise ValueError("fields must be a non-empty list or comma separated string")
+        unknown = [field for field in fields if field not in RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(map(str, unknown))}. Use: {', '.join(RESPONSE_FIELDS)}")
+        return set(fields)
+    if _is_true(data.get("slim", args.get("slim"))):
+        return set(SLIM_FIELDS)
+    return None
+
+
+def select_fields(response: Dict, fields: Optional[Set[str]]) -> Dict:
+    """drops the fields that weren't asked for; "success" always stays"""
+    if fields is None:
+        return response
+    return {key: value for key, value in response.items() if key == "success" or key in fields}
+
+
+def total_text_length(text_content: Dict) -> int:
+    """length of bio, posts and comments joined by single spaces, without building that string"""
+    posts = text_content.get("posts", [])
+    comments = text_content.get("comments", [])
+    # one separator before every post and comment
+    return (len(text_content.get("bio", "")) + sum(map(len, posts)) + sum(map(len, comments))
+            + len(posts) + len(comments))
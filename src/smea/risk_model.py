@@ -1,6 +1,13 @@
 from typing import Dict, List, Any
 import time
 
+try:
+    from .metrics import histogram
+except ImportError:
+    from metrics import histogram
+
+RISK_SCORING_SECONDS = histogram('smea_risk_scoring_seconds', 'RiskModel scoring time', ('step',))
+
 class RiskModel:
     def __init__(self):
         self.severity_weights = {
@@ -44,6 +51,7 @@ class RiskModel:
             'reddit': 1.3
         }
 
+    @RISK_SCORING_SECONDS.timed(stage='risk_scoring', step='score')
     def calculate_risk_score(self, analysis_data: List[Dict]) -> int:
         """calculates overall risk score from analysis data"""
         if not analysis_data:
@@ -102,6 +110,7 @@ class RiskModel:
         else:
             return 'minimal'
 
+    @RISK_SCORING_SECONDS.timed(stage='risk_scoring', step='recommendations')
     def generate_recommendations(self, analysis_data: List[Dict]) -> List[Dict]:
         """generates privacy recommendations based on findings"""
         recommendations = []
@@ -0,0 +1,35 @@
+from typing import Dict
+
+# named scrape profiles - trade latency for coverage on purpose
+# resultsLimit: posts fetched from the actor
+# maxComments: comments kept per post (0 skips comment scraping)
+# scrapeAbout: pulls the about section (facebook only)
+# timeoutSecs: time budget for the actor run
+SCRAPE_PROFILES = {
+    'fast': {
+        'instagram': {'resultsLimit': 20, 'maxComments': 0, 'timeoutSecs': 45},
+        'facebook': {'resultsLimit': 15, 'maxComments': 0, 'scrapeAbout': False, 'timeoutSecs': 60}
+    },
+    'standard': {
+        'instagram': {'resultsLimit': 50, 'maxComments': 0, 'timeoutSecs': 90},
+        'facebook': {'resultsLimit': 35, 'maxComments': 0, 'scrapeAbout': False, 'timeoutSecs': 120}
+    },
+    'deep': {
+        'instagram': {'resultsLimit': 100, 'maxComments': 20, 'timeoutSecs': 240},
+        'facebook': {'resultsLimit': 80, 'maxComments': 20, 'scrapeAbout': True, 'timeoutSecs': 300}
+    }
+}
+
+DEFAULT_PROFILE = 'standard'
+
+
+def get_scrape_profile(name: str, platform: str) -> Dict:
+    """gets the scrape settings for a profile and platform"""
+    name = name or DEFAULT_PROFILE
+    # the name comes from a JSON body and can be any type - lists and dicts aren't hashable
+    profile = SCRAPE_PROFILES.get(name) if isinstance(name, str) else None
+    if profile is None:
+        raise ValueError(f"Unknown scrape profile '{name}'. Use one of: {', '.join(SCRAPE_PROFILES)}")
+    if platform not in profile:
+        raise ValueError(f"Scrape profile '{name}' has no settings for {platform}")
+    return dict(profile[platform])
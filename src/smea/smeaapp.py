@@ -4,19 +4,55 @@ SMEA (Social Media Exposure Analyzer) Standalone Server
 Run directly from the SMEA folder
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 from instagram_service import InstagramService
-from pii_engine import PIIEngine
-from risk_model import RiskModel
+from admission import (
+    AdmissionController, AdmissionPolicy, ConcurrencyLimiter, RateLimiter, install_admission_control,
+    parse_api_keys
+)
+from analysis_pipeline import AnalysisPipeline, PlatformAdapter
+from metrics import CONTENT_TYPE, render_metrics
+from response_encoding import install_compression, install_json_provider
+from request_profiler import install_request_profiling
+from structured_logging import configure_logging, install_request_ids
 
 # loads environment variables from local .env file
 load_dotenv()
 
+# LOG_LEVEL / LOG_FORMAT - request logging goes through a background writer thread
+configure_logging()
+
+# fetch -> extract -> scan -> score, with one shared PIIEngine/RiskModel
+analysis_pipeline = AnalysisPipeline([
+    PlatformAdapter("instagram", "username", "Username", InstagramService.create_service)
+])
+
 app = Flask(__name__)
 CORS(app)  # allows frontend to connect
+# orjson for jsonify (JSON_ENCODER), gzip/brotli above RESPONSE_COMPRESSION_MIN_BYTES
+install_json_provider(app)
+install_compression(app)
+install_request_ids(app)
+
+# per-client token bucket (an X-API-Key listed in API_KEYS, else IP) plus a cap on concurrent actor runs
+admission = AdmissionController(
+    trust_proxy=os.getenv("ADMISSION_TRUST_PROXY") == "1", api_keys=parse_api_keys(os.getenv("API_KEYS"))
+)
+admission.limit(["analyze_instagram"], AdmissionPolicy(
+    "analyze",
+    RateLimiter.from_spec(os.getenv("RATE_LIMIT_ANALYZE", "6/min,3")),
+    ConcurrencyLimiter(
+        int(os.getenv("MAX_CONCURRENT_ACTOR_RUNS", "4")),
+        max_waiting=int(os.getenv("ACTOR_RUN_QUEUE_SIZE", "8")),
+        wait_secs=float(os.getenv("ACTOR_RUN_QUEUE_WAIT_SECS", "15"))
+    )
+))
+install_admission_control(app, admission)
+# X-Profile: 1 + X-Admin-Token samples one request; only installed with PROFILING_ADMIN_TOKEN
+install_request_profiling(app)
 
 @app.route("/")
 def home():
@@ -26,7 +62,8 @@ def home():
         "endpoints": {
             "validate": "/instagram/validate",
             "analyze": "/instagram/analyze",
-            "health": "/health"
+            "health": "/health",
+            "metrics": "/metrics"
         }
     })
 
@@ -61,74 +98,8 @@ def analyze_instagram():
     """
     analyzes Instagram profile for PII exposure
     """
-    try:
-        data = request.get_json()
-        username = data.get("username", "").strip()
-
-        if not username:
-            return jsonify({"error": "Username is required"}), 400
-
-        print(f"Starting analysis for @{username}")
-
-        # initializes services
-        instagram_service = InstagramService.create_service()
-        pii_engine = PIIEngine()
-        risk_model = RiskModel()
-
-        # gets Instagram data
-        user_data = instagram_service.get_user_data(username)
-        print(f"Retrieved data for @{username}")
-        
-        # extracts text content for analysis
-        text_content = instagram_service.extract_text_content(user_data)
-        print(f"Extracted text content: {len(text_content.get('posts', []))} posts")
-        
-        # runs PII analysis
-        findings = pii_engine.scan_for_pii(text_content)
-        print(f"Found {len(findings)} PII findings")
-        
-        # calculates risk assessment
-        analysis_data = [{"platform": "instagram", "findings": findings}]
-        risk_score = risk_model.calculate_risk_score(analysis_data)
-        risk_level = risk_model.get_risk_level(risk_score)
-        recommendations = risk_model.generate_recommendations(analysis_data)
-        
-        print(f"Risk score: {risk_score}/100 ({risk_level})")
-        
-        # prepares response
-        response_data = {
-            "success": True,
-            "userData": user_data,
-            "textContent": text_content,
-            "findings": findings,
-            "riskScore": risk_score,
-            "riskLevel": risk_level,
-            "recommendations": recommendations[:8],  # limits to top 8
-            "totalFindings": len(findings),
-            "severityBreakdown": pii_engine.get_summary(findings),
-            "profileStats": {
-                "postsAnalyzed": len(text_content.get("posts", [])),
-                "commentsAnalyzed": len(text_content.get("comments", [])),
-                "totalTextLength": len(" ".join([
-                    text_content.get("bio", ""),
-                    *text_content.get("posts", []),
-                    *text_content.get("comments", [])
-                ])),
-                "hasProfilePicture": bool(user_data.get("user", {}).get("profilePictureUrl")),
-                "isVerified": user_data.get("user", {}).get("isVerified", False)
-            }
-        }
-        
-        return jsonify(response_data)
-
-    except ValueError as e:
-        error_msg = f"Configuration error: {str(e)}"
-        print(f"❌ {error_msg}")
-        return jsonify({"error": error_msg}), 500
-    except Exception as e:
-        error_msg = f"Analysis failed: {str(e)}"
-        print(f"❌ {error_msg}")
-        return jsonify({"error": error_msg}), 500
+    body, status, headers = analysis_pipeline.handle("instagram", request.get_json(silent=True), request.args)
+    return jsonify(body), status, headers
 
 @app.route("/health", methods=["GET"])
 def health_check():
@@ -148,6 +119,11 @@ def health_check():
         }
     })
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """stage latency histograms and counters in the Prometheus text format"""
+    return Response(render_metrics(), mimetype=CONTENT_TYPE)
+
 if __name__ == "__main__":
     print("SMEA Instagram Privacy Analyzer")
     print("=" * 50)
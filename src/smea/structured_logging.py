@@ -0,0 +1,226 @@
+"""
+structured JSON logging that never blocks a request on stdout
+
+request threads only put records on a bounded queue; a QueueListener thread
+formats them (one JSON object per line) and does the writing. every record
+carries the id of the request that logged it, and extra= fields such as
+per-stage durations land in the JSON as-is. LOG_LEVEL is checked before a
+record is built, so a filtered level costs one integer compare
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+try:
+    from .metrics import counter
+except ImportError:
+    from metrics import counter
+
+LOGGER_NAME = "smea"
+REQUEST_ID_HEADER = "X-Request-ID"
+# records waiting for the writer thread; beyond this they're dropped, not waited on
+MAX_QUEUED_RECORDS = 10000
+
+_request_id = contextvars.ContextVar("smea_request_id", default=None)
+
+# attributes every LogRecord has - anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "requestId", "taskName"}
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def set_request_id(value: Optional[str] = None) -> str:
+    """binds a request id to the current context (a new one if none is given)"""
+    request_id = (value or "").strip()[:128] or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+class JsonFormatter(logging.Formatter):
+    """one JSON object per record: ts, level, logger, message, requestId and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        request_id = getattr(record, "requestId", None)
+        if request_id:
+            entry["requestId"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """[LEVEL] message key=value lines, for reading the dev server's console"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(
+            f"{key}={value}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRS
+        )
+        line = f"[{record.levelname}] {record.getMessage()}"
+        if fields:
+            line += f"  {fields}"
+        if getattr(record, "requestId", None):
+            line += f"  requestId={record.requestId}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _RequestQueueHandler(logging.handlers.QueueHandler):
+    """stamps the request id on the calling thread and hands formatting to the listener"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        # writes synchronously until this process has a listener (a preloading master never does)
+        self.direct: Optional[logging.Handler] = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.requestId = _request_id.get()
+        # the args may change once the call returns, so the message is rendered now
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.direct is not None:
+            self.direct.handle(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # a stalled stdout must not stall requests
+            self.dropped += 1
+
+
+_handler: Optional[_RequestQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+_setup_lock = threading.Lock()
+
+
+def _build_output_handler(log_format: str) -> logging.Handler:
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if log_format == "text" else JsonFormatter())
+    return output
+
+
+def start_log_listener():
+    """(re)starts the writer thread of this process
+
+    threads don't survive fork(), so a worker forked from a preloaded app calls
+    this again; it gets a fresh queue since a lock in the inherited one may be held
+    """
+    global _listener, _listener_pid
+    with _setup_lock:
+        if _handler is None or (_listener is not None and _listener_pid == os.getpid()):
+            return
+        _handler.queue = queue.Queue(MAX_QUEUED_RECORDS)
+        output = _build_output_handler(os.getenv("LOG_FORMAT", "json").lower())
+        _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+        _listener.start()
+        _listener_pid = os.getpid()
+        _handler.direct = None
+
+
+def _stop_log_listener():
+    # flushes what's still queued when the process exits normally
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+def configure_logging(level: Optional[str] = None, start_listener: bool = True) -> logging.Logger:
+    """sets up the "smea" logger once: LOG_LEVEL (default INFO), LOG_FORMAT json|text
+
+    start_listener=False (an app preloaded before fork) writes directly, with no
+    thread, until start_log_listener() runs in the worker
+    """
+    global _handler
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _handler is None:
+            _handler = _RequestQueueHandler(queue.Queue(MAX_QUEUED_RECORDS))
+            _handler.direct = _build_output_handler(os.getenv("LOG_FORMAT", "json").lower())
+            logger.addHandler(_handler)
+            # records stop here instead of reaching whatever the root logger prints
+            logger.propagate = False
+            atexit.register(_stop_log_listener)
+        logger.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    if start_listener:
+        start_log_listener()
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """a child of the "smea" logger, e.g. get_logger("unified_app")"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+LOG_RECORDS_DROPPED = counter("smea_log_records_dropped_total",
+                              "Log records dropped because the writer thread fell behind")
+LOG_RECORDS_DROPPED.set_callback(lambda: {(): dropped_records()})
+
+
+class StageTimings:
+    """wall time per stage of one request, in milliseconds, for its log record"""
+
+    def __init__(self, on_stage: Optional[Callable[[str, float], None]] = None):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        # called with (stage, seconds) as each stage ends, failed ones included
+        self.on_stage = on_stage
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages[name] = round(elapsed * 1000, 2)
+            if self.on_stage is not None:
+                self.on_stage(name, elapsed)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+
+def install_request_ids(app):
+    """tags each Flask request with X-Request-ID (the caller's or a new one) and echoes it back"""
+    from flask import request
+
+    @app.before_request
+    def assign_request_id():
+        set_request_id(request.headers.get(REQUEST_ID_HEADER))
+
+    @app.after_request
+    def echo_request_id(response):
+        request_id = _request_id.get()
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response